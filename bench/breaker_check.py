@@ -0,0 +1,89 @@
+"""Walk the circuit breaker through its states, directly and through _send().
+
+Exits non-zero on the first transition that goes wrong. No network: _post_action
+is replaced by a scripted fake.
+
+    python bench/breaker_check.py
+"""
+import asyncio, os, sys, tempfile, time
+from pathlib import Path
+
+os.environ.setdefault("DISCORD_TOKEN", "bench")
+os.environ.setdefault("API_BASE", "http://127.0.0.1:9/api")
+os.environ["DATA_DIR"] = tempfile.mkdtemp(prefix="tlk-bench-")
+os.environ.update(BREAKER_FAILS="3", BREAKER_COOLDOWN_S="0.05", RETRY_ATTEMPTS="1", METRICS_PORT="0")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import bot  # noqa: E402
+
+def expect(cond: bool, what: str):
+    print(("ok   " if cond else "FAIL ") + what)
+    if not cond:
+        sys.exit(1)
+
+def check_state_machine():
+    b = bot.CircuitBreaker(threshold=2, cooldown=0.05)
+    expect(b.allow() and b.state == "closed", "closed allows")
+    b.record_failure()
+    expect(b.state == "closed", "one failure stays closed")
+    b.record_failure()
+    expect(b.state == "open" and not b.allow(), "threshold trips to open and rejects")
+    time.sleep(0.06)
+    expect(b.allow() and b.state == "half_open", "cooldown -> half_open, first caller probes")
+    expect(not b.allow(), "only one probe at a time")
+    b.record_failure()
+    expect(b.state == "open", "failed probe re-opens")
+    time.sleep(0.06)
+    expect(b.allow(), "next probe after cooldown")
+    b.abort_probe()
+    expect(b.state == "half_open" and b.allow(), "aborted probe frees the slot")
+    b.record_success()
+    expect(b.state == "closed" and b.failures == 0, "successful probe closes")
+
+async def check_send():
+    script = []
+    async def fake_post(action, payload):
+        step = script.pop(0)
+        if isinstance(step, BaseException):
+            raise step
+        return step
+    bot._post_action = fake_post
+    br = bot.breaker
+
+    script[:] = [bot.APIUnavailable("down")] * 3
+    for _ in range(3):
+        try:
+            await bot._send("balance", {"user_id": "1"})
+        except bot.APIUnavailable:
+            pass
+    expect(br.state == "open", "_send: transient failures trip the breaker")
+    try:
+        await bot._send("balance", {"user_id": "1"})
+        expect(False, "_send: open breaker rejects")
+    except bot.CircuitOpen:
+        expect(True, "_send: open breaker rejects")
+
+    await asyncio.sleep(0.06)
+    script[:] = [ValueError("bug in decoding")]
+    try:
+        await bot._send("balance", {"user_id": "1"})
+    except ValueError:
+        pass
+    expect(not br._probing, "_send: unexpected exception releases the probe")
+
+    script[:] = [bot.APIRejected("no such user")]
+    try:
+        await bot._send("balance", {"user_id": "1"})
+    except bot.APIRejected:
+        pass
+    expect(br.state == "closed", "_send: a 4xx probe proves the Worker is up and closes")
+
+    br.state, br.opened_at = "open", 0.0
+    script[:] = [{"ok": True}]
+    expect(await bot._send("balance", {"user_id": "1"}) == {"ok": True} and br.state == "closed",
+           "_send: successful probe closes")
+
+if __name__ == "__main__":
+    check_state_machine()
+    asyncio.run(check_send())
+    print("breaker checks passed")
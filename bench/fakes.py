@@ -0,0 +1,113 @@
+"""Stand-ins for the discord.py objects a command handler touches.
+
+Every Discord REST call a handler would make is counted in a shared `Calls`
+counter (and can be given a simulated round-trip with `rtt`), so benches can
+report REST calls per command without a token or a gateway connection.
+"""
+import asyncio
+from collections import Counter
+
+class Calls(Counter):
+    def hit(self, what):
+        self[what] += 1
+
+class _Rest:
+    """Base for fakes that talk to Discord: count the call, then wait `rtt` seconds."""
+
+    def __init__(self, calls: Calls, rtt: float = 0.0):
+        self.calls, self.rtt = calls, rtt
+
+    async def _rest(self, what: str):
+        self.calls.hit(what)
+        if self.rtt:
+            await asyncio.sleep(self.rtt)
+
+class FakeMessage(_Rest):
+    def __init__(self, calls, view=None, content=None, rtt: float = 0.0):
+        super().__init__(calls, rtt)
+        self.view, self.content = view, content
+
+    async def edit(self, **kw):
+        await self._rest("message.edit")
+        if "view" in kw:
+            self.view = kw["view"]
+        return self
+
+class FakeResponse(_Rest):
+    def __init__(self, calls, message, sent: list, rtt: float = 0.0):
+        super().__init__(calls, rtt)
+        self.message, self.sent, self._done = message, sent, False
+
+    def is_done(self):
+        return self._done
+
+    async def defer(self, **_kw):
+        await self._rest("response.defer")
+        self._done = True
+
+    async def send_message(self, content=None, **_kw):
+        await self._rest("response.send_message")
+        self.sent.append(content)
+        self._done = True
+
+    async def edit_message(self, **kw):
+        await self._rest("response.edit_message")
+        self._done = True
+        if "view" in kw:
+            self.message.view = kw["view"]
+
+    async def send_modal(self, modal):
+        await self._rest("response.send_modal")
+        self._done = True
+
+class FakeFollowup(_Rest):
+    def __init__(self, calls, sent: list, rtt: float = 0.0):
+        super().__init__(calls, rtt)
+        self.sent = sent
+        self.last = None
+
+    async def send(self, content=None, **kw):
+        await self._rest("followup.send")
+        self.sent.append(content)
+        self.last = FakeMessage(self.calls, kw.get("view"), content, self.rtt)
+        return self.last
+
+class FakeChannel(_Rest):
+    id = 1
+
+    def __init__(self, calls, rtt: float = 0.0):
+        super().__init__(calls, rtt)
+        self.last = None
+
+    async def send(self, content=None, **kw):
+        await self._rest("channel.send")
+        self.last = FakeMessage(self.calls, kw.get("view"), content, self.rtt)
+        return self.last
+
+class FakeUser:
+    def __init__(self, uid: int = 42, name: str = "bench"):
+        self.id = uid
+        self.mention = f"<@{uid}>"
+        self.display_name = name
+
+class FakeInteraction:
+    """Enough of discord.Interaction for command callbacks. `followup` reads the
+       `_cs_followup` slot like the real class, so @instrumented's proxy applies."""
+    command = None
+    guild = None
+
+    def __init__(self, calls, channel, message=None, user: FakeUser | None = None, rtt: float = 0.0):
+        self.calls = calls
+        self.user = user or FakeUser()
+        self.channel = channel
+        self.message = message or FakeMessage(calls, rtt=rtt)
+        self.sent: list = []   # every content string the handler sent back
+        self.response = FakeResponse(calls, self.message, self.sent, rtt)
+        self._cs_followup = FakeFollowup(calls, self.sent, rtt)
+
+    @property
+    def followup(self):
+        return self._cs_followup
+
+    async def edit_original_response(self, **_kw):
+        await self.response._rest("edit_original_response")
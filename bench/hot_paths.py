@@ -0,0 +1,196 @@
+"""Micro-benchmarks for the per-card pure-Python paths every command runs:
+_normalize_card, the reveal rarity sort, and the embed/line builders.
+
+Timings are divided by a fixed calibration loop, so the committed baselines
+(bench/baselines/hot_paths.json) compare across machines. The legacy column is
+the inline code the shared formatters replaced; its output is also checked for
+equality so a refactor can't silently change what users see.
+
+    python bench/hot_paths.py                 # table vs baseline and legacy
+    python bench/hot_paths.py --check         # exit 1 if any case regressed past --tolerance
+    python bench/hot_paths.py --save          # rewrite the baselines (median of --passes runs)
+"""
+import argparse, json, os, random, statistics, sys, tempfile, timeit
+from pathlib import Path
+
+os.environ.setdefault("DISCORD_TOKEN", "bench")
+os.environ.setdefault("API_BASE", "http://127.0.0.1:9/api")
+os.environ["DATA_DIR"] = tempfile.mkdtemp(prefix="tlk-bench-")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import bot  # noqa: E402
+
+BASELINES = Path(__file__).with_name("baselines") / "hot_paths.json"
+RARITIES = ["N", "R", "AR", "SR", "SSR"]
+
+def _card(i: int, rng: random.Random) -> dict:
+    return {
+        "card_id": f"PLR{i:04d}", "name": f"Player {i}", "rarity": rng.choice(RARITIES),
+        "club": f"Club {i % 16}", "position": ["GK", "DF", "MF", "FW"][i % 4],
+        "serial_no": rng.choice([None, rng.randint(1, 500)]), "image_ref": f"https://cdn.example/{i}.png",
+    }
+
+# --- legacy reference implementations (the inline code before the shared formatters) ---
+_LEGACY_EMOJI = {"N": "⚪", "R": "🟦", "AR": "🟪", "SR": "🟧", "SSR": "🟨"}
+
+def legacy_normalize(x) -> "bot.Card":
+    if isinstance(x, bot.Card):
+        return x
+    return bot.Card(x.get("card_id"), x.get("name") or x.get("player") or x.get("printcode") or "Unknown",
+                    x.get("rarity"), x.get("serial_no") or x.get("serial"), x.get("image_ref") or x.get("image_url"))
+
+def legacy_sort(pulls):
+    return tuple(sorted(map(legacy_normalize, pulls), key=lambda r: bot.RARITY_ORDER.get(r.rarity or "", -1)))
+
+def legacy_summary_lines(pulls_sorted):
+    lines = []
+    for r in pulls_sorted:
+        rarity_em = {"N": "⚪", "R": "🟦", "AR": "🟪", "SR": "🟧", "SSR": "🟨"}
+        em = rarity_em.get(r.get("rarity", ""), "📦")
+        nm = r.get("name", "(unknown)")
+        rn = r.get("rarity", "")
+        sn = r.get("serial_no")
+        lines.append(f"{em} **{nm}** [{rn}] " + (f"#**{sn}**" if sn else ""))
+    return "\n".join(lines)
+
+def legacy_card_title(card):
+    name, rarity, serial = card.get("name", "(unknown)"), card.get("rarity", ""), card.get("serial_no")
+    return f"{_LEGACY_EMOJI.get(rarity, '📦')} {name} [{rarity}]" + (f"  •  #{serial}" if serial else "")
+
+def legacy_highlights(pulls):
+    pulls = sorted(pulls, key=lambda r: bot.RARITY_ORDER.get((r.get("rarity") or ""), -1), reverse=True)
+    tally = {}
+    for c in pulls:
+        tally[c.get("rarity") or "?"] = tally.get(c.get("rarity") or "?", 0) + 1
+    counts = " • ".join(f"{_LEGACY_EMOJI.get(r, '📦')} {r}×{n}"
+                        for r, n in sorted(tally.items(), key=lambda kv: -bot.RARITY_ORDER.get(kv[0], -1)))
+    top = [c for c in pulls if c.get("rarity") in ("SR", "SSR")][:10]
+    return [counts] + [f"{_LEGACY_EMOJI.get(c.get('rarity'), '📦')} **{c.get('name')}** [{c.get('rarity')}]"
+                       + (f" #{c.get('serial_no')}" if c.get("serial_no") else "") for c in top]
+
+def legacy_detail_lines(pulled):
+    lines = []
+    for i, it in enumerate(pulled, 1):
+        name = it.get("name") or it.get("player") or it.get("printcode") or it.get("card_id") or "Unknown"
+        rarity = (it.get("rarity") or "").strip()
+        club = it.get("club") or it.get("Club") or ""
+        pos = it.get("position") or ""
+        serial = it.get("serial") or it.get("serial_no")
+        serial_txt = f" #{serial}" if serial not in (None, "", 0) else ""
+        bits = [rarity, club, pos]
+        lines.append(f"{i}. **{name}** · {' • '.join([b for b in bits if b])}{serial_txt}")
+    return lines
+
+def legacy_yield_lines(results):
+    out = []
+    for i, it in enumerate(results, 1):
+        nm = it.get("name") or it.get("player") or it.get("printcode") or it.get("card_id") or "Unknown"
+        rr = (it.get("rarity") or "").strip()
+        sn = it.get("serial") or it.get("serial_no")
+        sn_txt = f" #{sn}" if sn not in (None, "", 0) else ""
+        out.append(f"{i}. **{nm}** {f'[{rr}]' if rr else ''}{sn_txt}")
+    return out
+
+def legacy_collection_labels(items):
+    out = []
+    for i, it in enumerate(items, 1):
+        nm, rn, sn = it.get("name", "(unknown)"), it.get("rarity", ""), it.get("serial_no")
+        out.append(f"{i}. {nm} [{rn}] " + (f"#{sn}" if sn else ""))
+    return out
+
+def cases(rng: random.Random) -> dict:
+    """name -> (current fn, legacy fn or None); each fn takes no args."""
+    pack = [_card(i, rng) for i in range(5)]
+    multi = [_card(i, rng) for i in range(50)]
+    page = [_card(i, rng) for i in range(50)]
+    pack_cards = tuple(sorted(map(bot._normalize_card, pack), key=bot.rarity_rank))
+    multi_cards = [bot._normalize_card(c) for c in multi]
+    return {
+        "normalize_card x50": (lambda: [bot._normalize_card(c) for c in page],
+                               lambda: [legacy_normalize(c) for c in page]),
+        "reveal_sort pack5": (lambda: tuple(sorted(map(bot._normalize_card, pack), key=bot.rarity_rank)),
+                              lambda: legacy_sort(pack)),
+        "summary_lines pack5": (lambda: "\n".join(map(bot.summary_line, pack_cards)),
+                                lambda: legacy_summary_lines(pack_cards)),
+        "card_titles pack5": (lambda: [bot.card_title(c) for c in pack_cards],
+                              lambda: [legacy_card_title(c) for c in pack_cards]),
+        "highlights x50": (lambda: [bot.rarity_tally(s := sorted(multi_cards, key=bot.rarity_rank, reverse=True))]
+                           + list(map(bot.highlight_line, [c for c in s if c.rarity in ("SR", "SSR")][:10])),
+                           lambda: legacy_highlights(multi_cards)),
+        "detail_lines pack5": (lambda: bot.detail_lines(pack),
+                               lambda: legacy_detail_lines(pack)),
+        "yield_lines x10": (lambda: bot.yield_lines(page[:10]),
+                            lambda: legacy_yield_lines(page[:10])),
+        "collection_labels x10": (lambda: bot.collection_labels(page[:10]),
+                                  lambda: legacy_collection_labels(page[:10])),
+        "summary_embed pack5": (lambda: bot._summary_embed(pack_cards, "Base Pack", False), None),
+        "card_embeds pack5": (lambda: [bot._card_embed(c, i, 5) for i, c in enumerate(pack_cards, 1)], None),
+        "highlights_embed x50": (lambda: bot._highlights_embed([multi_cards[i:i + 5] for i in range(0, 50, 5)],
+                                                               "Base Pack", 0), None),
+    }
+
+_CAL = {str(i): i for i in range(64)}
+
+def _calibration_work():
+    """Fixed dict/str workload, similar in kind to the cases; every score is a multiple of it."""
+    return "".join(f"{k}:{_CAL.get(k)}" for k in _CAL)
+
+class _Sampler:
+    """Times several fns in alternation so they all see the same machine noise."""
+
+    def __init__(self, *fns):
+        self.timers = [timeit.Timer(f) for f in fns]
+        self.loops = [max(1, t.autorange()[0] // 12) for t in self.timers]   # ~15 ms per sample
+
+    def best(self, samples: int = 7) -> list[float]:
+        out = [float("inf")] * len(self.timers)
+        for _ in range(samples):
+            for i, (t, n) in enumerate(zip(self.timers, self.loops)):
+                out[i] = min(out[i], t.timeit(n) / n)
+        return out
+
+def _same(a, b) -> bool:
+    if isinstance(a, (tuple, list)) and a and isinstance(a[0], bot.Card):
+        return [c.row() for c in a] == [c.row() for c in b]
+    return a == b
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--check", action="store_true", help="fail if a case is slower than baseline × tolerance")
+    ap.add_argument("--save", action="store_true", help="write current results as the new baselines")
+    ap.add_argument("--tolerance", type=float, default=1.30)
+    ap.add_argument("--passes", type=int, default=5, help="score is the median over this many passes")
+    ns = ap.parse_args()
+
+    base = json.loads(BASELINES.read_text()) if BASELINES.exists() else {}
+    results, failures = {}, []
+    print("score = case time / calibration time, sampled together (lower is better)")
+    print(f"  {'case':24s} {'µs':>9s} {'score':>7s} {'base':>7s} {'Δ':>7s} {'legacy µs':>10s} {'speedup':>8s}")
+    for name, (cur, legacy) in cases(random.Random(7)).items():
+        sampler = _Sampler(cur, _calibration_work, *([legacy] if legacy else []))
+        runs = [sampler.best() for _ in range(ns.passes)]
+        score = statistics.median(r[0] / r[1] for r in runs)
+        t = statistics.median(r[0] for r in runs)
+        results[name] = round(score, 4)
+        b = base.get(name)
+        delta = f"{(score / b - 1) * 100:+6.1f}%" if b else "    new"
+        leg = ""
+        if legacy is not None:
+            if not _same(cur(), legacy()):
+                failures.append(f"{name}: output differs from legacy")
+            lt = statistics.median(r[2] for r in runs)
+            leg = f"{lt * 1e6:10.2f} {lt / t:7.2f}x"
+        print(f"  {name:24s} {t * 1e6:9.2f} {score:7.2f} {b if b else '':>7} {delta} {leg}")
+        if ns.check and b and score > b * ns.tolerance:
+            failures.append(f"{name}: {score:.2f} vs baseline {b:.2f} (> {ns.tolerance:.2f}x)")
+
+    if ns.save:
+        BASELINES.parent.mkdir(parents=True, exist_ok=True)
+        BASELINES.write_text(json.dumps(results, indent=2, ensure_ascii=False) + "\n")
+        print(f"baselines written to {BASELINES}")
+    for f in failures:
+        print("FAIL", f)
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Decode cost of representative Worker responses: the old text()+json.loads path
+(plus the second parse of last_draw's result_json) against bot's codec path
+(bytes straight into json_loads, result_json expanded once).
+
+    python bench/json_codec.py [rounds]
+    JSON_CODEC=json python bench/json_codec.py     # force the stdlib fallback
+"""
+import json, os, sys, tempfile, timeit
+from pathlib import Path
+
+os.environ.setdefault("DISCORD_TOKEN", "bench")
+os.environ.setdefault("API_BASE", "http://127.0.0.1:9/api")
+os.environ["DATA_DIR"] = tempfile.mkdtemp(prefix="tlk-bench-")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import bot  # noqa: E402
+
+RARITIES = ["N", "R", "AR", "SR", "SSR"]
+
+def _card(i: int) -> dict:
+    return {
+        "card_id": f"PLR{i:05d}", "name": f"Player Número {i}", "rarity": RARITIES[i % 5],
+        "club": f"Club {i % 40}", "position": ["GK", "DF", "MF", "FW"][i % 4], "batch": f"B{i % 3}",
+        "serial_no": i + 1, "image_ref": f"https://cdn.example/cards/{i}.png",
+    }
+
+def payloads() -> dict[str, bytes]:
+    pulls = [_card(i) for i in range(5)]
+    return {
+        "collection(50)": json.dumps({"ok": True, "data": {
+            "items": [_card(i) for i in range(50)], "total": 1234,
+            "counts": {r: 100 + i for i, r in enumerate(RARITIES)}}}).encode(),
+        "shop list": json.dumps({"ok": True, "data": {"items": [
+            {"sku": f"SKU{i}", "name": f"Item {i}", "price": 100 * i, "currency": "coins", "stock": i}
+            for i in range(60)]}}).encode(),
+        "last_draw": json.dumps({"ok": True, "data": {
+            "user_id": "42", "pack_id": "Base Pack", "request_id": "r" * 32,
+            "result_json": json.dumps(pulls)}}).encode(),
+        "dex_list(2000)": json.dumps({"ok": True, "data": {"items": [_card(i) for i in range(2000)]}}).encode(),
+    }
+
+def old_path(raw: bytes):
+    body = json.loads(raw.decode("utf-8"))
+    data = body.get("data", {})
+    if isinstance(data.get("result_json"), str):
+        json.loads(data["result_json"])
+    return data
+
+def new_path(raw: bytes):
+    return bot._expand_result_json(bot.json_loads(raw).get("data", {}))
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    print(f"codec: {bot.JSON_CODEC}   rounds: {rounds}")
+    print(f"  {'payload':16s} {'bytes':>8s} {'old µs':>9s} {'new µs':>9s} {'speedup':>8s}")
+    for name, raw in payloads().items():
+        old = min(timeit.repeat(lambda: old_path(raw), number=rounds, repeat=5)) / rounds * 1e6
+        new = min(timeit.repeat(lambda: new_path(raw), number=rounds, repeat=5)) / rounds * 1e6
+        print(f"  {name:16s} {len(raw):8d} {old:9.1f} {new:9.1f} {old / new:7.2f}x")
+    payload = {"user_id": "42", "page": 3, "page_size": 50, "rarity": "ALL", "unique_only": False}
+    enc_old = min(timeit.repeat(lambda: json.dumps({"action": "collection", **payload}).encode(), number=rounds * 10, repeat=5))
+    enc_new = min(timeit.repeat(lambda: bot.json_dumpb({"action": "collection", **payload}), number=rounds * 10, repeat=5))
+    print(f"  {'request encode':16s} {'':8s} {enc_old / rounds / 10 * 1e6:9.2f} {enc_new / rounds / 10 * 1e6:9.2f} {enc_old / enc_new:7.2f}x")
+
+if __name__ == "__main__":
+    main()
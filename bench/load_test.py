@@ -0,0 +1,174 @@
+"""Drive bot.py's slash-command callbacks at N concurrent users against the mock Worker.
+
+Starts bench/mock_worker.py in-process, points API_BASE at it, then has every
+simulated user loop over a weighted command mix using fake Interactions
+(bench/fakes.py). Reports throughput, latency percentiles, Discord REST calls
+per command and Worker requests per action.
+
+    python bench/load_test.py --users 50 --duration 20
+    python bench/load_test.py --users 200 --duration 30 --latency-ms 80 --error-rate 0.02 --reveal instant
+    python bench/load_test.py --mix open=5,collection=3,balance=2
+"""
+import argparse, asyncio, os, random, sys, tempfile, time
+from collections import Counter, defaultdict
+from pathlib import Path
+
+from discord import app_commands
+
+import mock_worker
+from fakes import Calls, FakeChannel, FakeInteraction, FakeUser
+
+DEFAULT_MIX = {
+    "open": 30, "open_multi": 3, "collection": 15, "collection_next": 5, "balance": 12, "last_pack": 8,
+    "sell": 5, "sell_all_dupes": 3, "shop": 4, "shop_buy": 2, "craft": 3, "autocomplete": 8, "ping": 2,
+}
+
+def _parse_mix(raw: str) -> dict[str, int]:
+    if not raw:
+        return dict(DEFAULT_MIX)
+    out = {}
+    for part in raw.split(","):
+        name, _, w = part.partition("=")
+        if name.strip() not in DEFAULT_MIX:
+            raise SystemExit(f"unknown command in --mix: {name} (known: {', '.join(DEFAULT_MIX)})")
+        out[name.strip()] = int(w or 1)
+    return out
+
+def _pct(sorted_vals: list[float], q: float) -> float:
+    if not sorted_vals:
+        return 0.0
+    return sorted_vals[min(len(sorted_vals) - 1, int(q * len(sorted_vals)))]
+
+class Driver:
+    def __init__(self, bot, state: "mock_worker.GameState", ns: argparse.Namespace):
+        self.bot, self.state, self.ns = bot, state, ns
+        self.rtt = ns.discord_ms / 1000
+        self.latency: dict[str, list[float]] = defaultdict(list)
+        self.rest: Counter = Counter()
+        self.errors: Counter = Counter()
+        self.reveal = app_commands.Choice(name=ns.reveal, value=ns.reveal) if ns.reveal else None
+
+    def _itx(self, uid: int, calls: Calls, channel: FakeChannel, message=None) -> FakeInteraction:
+        return FakeInteraction(calls, channel, message, user=FakeUser(uid, f"user{uid}"), rtt=self.rtt)
+
+    def _owned_dupe(self, uid: int) -> str:
+        seen = set()
+        for c in self.state.user(uid)["cards"]:
+            if c["card_id"] in seen:
+                return c["card_id"]
+            seen.add(c["card_id"])
+        return "PLR0000"
+
+    async def run_command(self, name: str, uid: int, rng: random.Random):
+        b = self.bot
+        calls = Calls()
+        channel = FakeChannel(calls, self.rtt)
+        itx = self._itx(uid, calls, channel)
+        t0 = time.perf_counter()
+        try:
+            if name == "open":
+                await b.open_pack.callback(itx, pack="Base Pack", reveal=self.reveal, count=1)
+            elif name == "open_multi":
+                await b.open_pack.callback(itx, pack="Base Pack", reveal=self.reveal, count=5)
+            elif name in ("collection", "collection_next"):
+                await b.collection.callback(itx, page=1)
+                if name == "collection_next":
+                    # Flip the browser the command just posted.
+                    view = itx.followup.last.view if itx.followup.last else None
+                    if view is not None and not view.next_page.disabled:
+                        await view.next_page.callback(self._itx(uid, calls, channel))
+            elif name == "balance":
+                await b.balance.callback(itx)
+            elif name == "last_pack":
+                await b.last_pack.callback(itx)
+            elif name == "sell":
+                await b.sell.callback(itx, card_id=self._owned_dupe(uid))
+            elif name == "sell_all_dupes":
+                await b.sell_all_dupes.callback(itx)
+            elif name == "shop":
+                await b.shop.callback(itx)
+            elif name == "shop_buy":
+                await b.shop.callback(itx, buy_item_id=rng.choice(self.state.shop_items)["sku"])
+            elif name == "craft":
+                await b.craft.callback(itx, card_id=rng.choice(self.state.catalog)["card_id"])
+            elif name == "autocomplete":
+                await b.ac_card_id(itx, rng.choice(["pl", "player 1", "club c", "PLR01", "9"]))
+            elif name == "starter":
+                await b.starter.callback(itx)
+            elif name == "ping":
+                await b.ping.callback(itx)
+            if any(isinstance(s, str) and s.startswith(("⚠️", "Error")) for s in itx.sent):
+                self.errors[name] += 1
+        except Exception as e:
+            self.errors[name] += 1
+            self.errors[f"{name}:{type(e).__name__}"] += 1
+        self.latency[name].append(time.perf_counter() - t0)
+        self.rest[name] += sum(calls.values())
+
+    async def user_loop(self, uid: int, deadline: float, mix: dict[str, int]):
+        rng = random.Random(uid)
+        names, weights = list(mix), list(mix.values())
+        await self.run_command("starter", uid, rng)
+        while time.perf_counter() < deadline:
+            await self.run_command(rng.choices(names, weights)[0], uid, rng)
+            if self.ns.think_ms:
+                await asyncio.sleep(rng.uniform(0, 2 * self.ns.think_ms) / 1000)
+
+    def report(self, elapsed: float, worker_stats: Counter):
+        total = sum(len(v) for v in self.latency.values())
+        print(f"\n{self.ns.users} users × {elapsed:.1f}s  →  {total} commands, {total / elapsed:.1f} cmd/s"
+              f"  (Worker {self.ns.latency_ms:g}±{self.ns.jitter_ms:g} ms, Discord {self.ns.discord_ms:g} ms)")
+        print(f"  {'command':16s} {'n':>6s} {'err':>5s} {'p50 ms':>8s} {'p95 ms':>8s} {'p99 ms':>8s} {'max ms':>8s} {'REST/cmd':>9s}")
+        for name in sorted(self.latency, key=lambda n: -len(self.latency[n])):
+            lat = sorted(self.latency[name])
+            n = len(lat)
+            print(f"  {name:16s} {n:6d} {self.errors[name]:5d} {_pct(lat, .50) * 1e3:8.1f} {_pct(lat, .95) * 1e3:8.1f}"
+                  f" {_pct(lat, .99) * 1e3:8.1f} {lat[-1] * 1e3:8.1f} {self.rest[name] / n:9.2f}")
+        kinds = sorted(k for k in self.errors if ":" in k)
+        if kinds:
+            print("  exceptions: " + ", ".join(f"{k}={self.errors[k]}" for k in kinds))
+        print("  Worker requests: " + ", ".join(f"{a}={n}" for a, n in worker_stats.most_common()))
+        served = self.bot.metrics.counters.get("tlk_api_calls_total", {})
+        by_source = Counter()
+        for lbl, v in served.items():
+            by_source[dict(lbl)["source"]] += v
+        print("  call_sheet served: " + ", ".join(f"{k}={int(v)}" for k, v in by_source.most_common()))
+
+async def main_async(ns: argparse.Namespace):
+    runner = await mock_worker.start(mock_worker.config_from_args(ns), port=ns.port)
+    import bot   # after API_BASE points at the mock
+    app = runner.app
+    driver = Driver(bot, app["state"], ns)
+    await bot.refresh_dex_index()
+    deadline = time.perf_counter() + ns.duration
+    t0 = time.perf_counter()
+    await asyncio.gather(*(driver.user_loop(10_000 + i, deadline, _parse_mix(ns.mix)) for i in range(ns.users)))
+    elapsed = time.perf_counter() - t0
+    await asyncio.gather(*bot._background_tasks, return_exceptions=True)
+    driver.report(elapsed, app["stats"])
+    await bot.bot.http_session.close()
+    await runner.cleanup()
+
+def main():
+    ap = argparse.ArgumentParser(description="Load-test bot.py command handlers against the mock Worker.")
+    ap.add_argument("--users", type=int, default=50)
+    ap.add_argument("--duration", type=float, default=15.0)
+    ap.add_argument("--mix", default="", help="weights, e.g. open=5,collection=3 (default: a realistic blend)")
+    ap.add_argument("--reveal", choices=["manual", "auto", "instant"], default=None)
+    ap.add_argument("--discord-ms", type=float, default=0.0, help="simulated Discord REST round-trip")
+    ap.add_argument("--think-ms", type=float, default=0.0, help="mean pause between a user's commands")
+    ap.add_argument("--port", type=int, default=8787)
+    mock_worker.add_args(ap)
+    ns = ap.parse_args()
+
+    os.environ.update({
+        "DISCORD_TOKEN": "loadtest", "API_BASE": f"http://127.0.0.1:{ns.port}/api", "API_SECRET": ns.secret,
+        "GUILD_ID": "1", "ADMIN_USER_ID": "1", "COMMAND_CHANNEL_ID": "0", "HYPE_CHANNEL_ID": "0",
+        "METRICS_PORT": "0", "AUTO_REVEAL_DELAY_S": "0",
+        "DATA_DIR": tempfile.mkdtemp(prefix="tlk-load-"),
+    })
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    asyncio.run(main_async(ns))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,362 @@
+"""Offline stand-in for the Cloudflare Worker behind API_BASE.
+
+Implements every action bot.py calls against an in-memory game state, wrapped
+in the same {ok, data, error} envelope, with configurable latency and fault
+injection:
+
+    python bench/mock_worker.py --port 8787 --latency-ms 40 --jitter-ms 15 --error-rate 0.01
+    API_BASE=http://127.0.0.1:8787/api python bot.py
+
+Per-action latency overrides take JSON, e.g. --action-latency '{"open_base": 150}'.
+Faults: --error-rate answers 503, --reject-rate answers ok:false, --timeout-rate
+stalls for --hang-s (longer than any client budget).
+"""
+import argparse, asyncio, json, random, time, uuid
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+
+from aiohttp import web
+
+RARITIES       = ["N", "R", "AR", "SR", "SSR"]
+RARITY_WEIGHTS = [55, 25, 12, 6, 2]
+SELL_VALUE     = {"N": 1, "R": 3, "AR": 8, "SR": 20, "SSR": 60}
+CRAFT_COST     = {"N": 5, "R": 15, "AR": 40, "SR": 100, "SSR": 300}
+PACK_SIZE      = 5
+
+@dataclass
+class MockConfig:
+    latency_ms: float = 30.0
+    jitter_ms: float = 10.0
+    action_latency: dict = field(default_factory=dict)   # action -> ms, replaces latency_ms
+    error_rate: float = 0.0
+    reject_rate: float = 0.0
+    timeout_rate: float = 0.0
+    hang_s: float = 60.0
+    start_tickets: int = 1_000_000
+    start_tokens: int = 500
+    catalog_size: int = 400
+    god_rate: float = 0.01
+    secret: str = ""
+    seed: int | None = None
+    art_base: str = ""        # image_ref prefix; start() points it at this server's /art route
+
+# 1x1 PNG: enough for the gallery renderer to decode, cheap to serve.
+ART_PNG = bytes.fromhex(
+    "89504e470d0a1a0a0000000d4948445200000001000000010802000000907753de"
+    "0000000c4944415408d763f8cfc0f00f0003010100c9fe92ef0000000049454e44ae426082"
+)
+
+def _catalog(n: int, rng: random.Random, art_base: str) -> list[dict]:
+    clubs = [f"Club {c}" for c in "ABCDEFGHIJKLMNOP"]
+    out = []
+    for i in range(n):
+        rarity = rng.choices(RARITIES, RARITY_WEIGHTS)[0]
+        out.append({
+            "card_id": f"PLR{i:04d}", "name": f"Player {i}", "club": clubs[i % len(clubs)],
+            "position": ["GK", "DF", "MF", "FW"][i % 4], "batch": f"B{i % 3 + 1}", "rarity": rarity,
+            "image_ref": f"{art_base or 'https://cdn.example/cards'}/PLR{i:04d}.png",
+        })
+    return out
+
+class GameState:
+    """Users, cards and draws. Every handler returns the `data` payload or raises Reject."""
+
+    def __init__(self, cfg: MockConfig):
+        self.cfg = cfg
+        self.rng = random.Random(cfg.seed)
+        self.catalog = _catalog(cfg.catalog_size, self.rng, cfg.art_base)
+        self.by_id = {c["card_id"]: c for c in self.catalog}
+        self.by_rarity = defaultdict(list)
+        for c in self.catalog:
+            self.by_rarity[c["rarity"]].append(c)
+        self.users: dict[str, dict] = {}
+        self.serials: Counter = Counter()
+        self.draws_by_rid: dict[str, dict] = {}
+        self.shop_items = [
+            {"sku": f"PLR{i:04d}", "name": self.catalog[i]["name"], "price": {"currency": "tokens", "value": 25},
+             "stock": 1000, "limit": 5}
+            for i in range(0, min(len(self.catalog), 60), 2)
+        ] + [{"sku": "TICKETS10", "name": "10 Tickets", "price": {"currency": "tokens", "value": 50}, "stock": None}]
+
+    def user(self, uid) -> dict:
+        uid = str(uid)
+        u = self.users.get(uid)
+        if u is None:
+            u = self.users[uid] = {"tickets": self.cfg.start_tickets, "tokens": self.cfg.start_tokens, "cards": [],
+                                   "draws": [], "starter": False}
+        return u
+
+    def _mint(self, card: dict) -> dict:
+        self.serials[card["card_id"]] += 1
+        return {**card, "serial_no": self.serials[card["card_id"]]}
+
+    def _pull(self, god: bool) -> dict:
+        rarity = self.rng.choice(["SR", "SSR"]) if god else self.rng.choices(RARITIES, RARITY_WEIGHTS)[0]
+        pool = self.by_rarity.get(rarity) or self.catalog
+        return self._mint(self.rng.choice(pool))
+
+    def _draw(self, uid: str, pack_id: str, request_id: str | None) -> dict:
+        u = self.user(uid)
+        if u["tickets"] < 1:
+            raise Reject("not enough tickets")
+        u["tickets"] -= 1
+        god = self.rng.random() < self.cfg.god_rate
+        pulls = [self._pull(god) for _ in range(PACK_SIZE)]
+        u["cards"].extend(pulls)
+        draw = {"user_id": uid, "pack_id": pack_id, "request_id": request_id or uuid.uuid4().hex,
+                "ts": int(time.time() * 1000), "results": pulls, "godPack": god,
+                "tickets_balance": u["tickets"], "tokens_balance": u["tokens"]}
+        u["draws"].append(draw)
+        if request_id:
+            self.draws_by_rid[request_id] = draw
+        return draw
+
+    def _balances(self, u: dict) -> dict:
+        return {"tickets_balance": u["tickets"], "tokens_balance": u["tokens"]}
+
+    # --- actions ---
+    def open_pack(self, p: dict, pack_id: str | None = None) -> dict:
+        uid, rid = str(p["user_id"]), p.get("request_id")
+        pack_id = pack_id or p.get("pack_id") or "base"
+        count = max(1, int(p.get("count") or 1))
+        if rid and rid in self.draws_by_rid:   # idempotent replay
+            first = self.draws_by_rid[rid]
+            if count == 1:
+                return first
+            return {"packs": [self.draws_by_rid.get(rid if i == 0 else f"{rid}:{i}", first) for i in range(count)]}
+        if count == 1:
+            return self._draw(uid, pack_id, rid)
+        if self.user(uid)["tickets"] < count:
+            raise Reject("not enough tickets")
+        return {"packs": [self._draw(uid, pack_id, rid if i == 0 else (rid and f"{rid}:{i}")) for i in range(count)]}
+
+    def open_base(self, p):
+        return self.open_pack(p, "base")
+
+    def starter(self, p):
+        u = self.user(p["user_id"])
+        if u["starter"]:
+            raise Reject("starter already claimed")
+        u["starter"] = True
+        u["tickets"] += 1
+        draw = self._draw(str(p["user_id"]), "starter", None)
+        return {**draw, "pack_name": "Starter Pack"}
+
+    def collection(self, p):
+        u = self.user(p["user_id"])
+        cards = u["cards"]
+        for key in ("rarity", "position", "batch"):
+            want = p.get(key) or "ALL"
+            if want != "ALL":
+                cards = [c for c in cards if c.get(key) == want]
+        if p.get("unique_only"):
+            seen, uniq = set(), []
+            for c in cards:
+                if c["card_id"] not in seen:
+                    seen.add(c["card_id"])
+                    uniq.append(c)
+            cards = uniq
+        cards = sorted(cards, key=lambda c: (-RARITIES.index(c["rarity"]), c["card_id"], c["serial_no"]))
+        page, size = max(1, int(p.get("page") or 1)), max(1, min(100, int(p.get("page_size") or 10)))
+        counts = Counter(c["rarity"] for c in cards)
+        return {"items": cards[(page - 1) * size: page * size], "total": len(cards),
+                "counts": {r: counts[r] for r in RARITIES if counts[r]},
+                "balances": {"tickets": u["tickets"], "tokens": u["tokens"]}}
+
+    def last_draw(self, p):
+        u = self.user(p["user_id"])
+        rid = p.get("request_id")
+        draw = self.draws_by_rid.get(rid) if rid else (u["draws"][-1] if u["draws"] else None)
+        if not draw:
+            return {}
+        row = {k: v for k, v in draw.items() if k != "results"}
+        row["result_json"] = json.dumps(draw["results"])   # the Worker stores the pulls as a JSON column
+        return row
+
+    def _dupes(self, u: dict) -> dict:
+        groups = defaultdict(list)
+        for c in u["cards"]:
+            groups[c["card_id"]].append(c)
+        return groups
+
+    def sell(self, p):
+        u = self.user(p["user_id"])
+        copies = self._dupes(u).get(p.get("card_id"), [])
+        if len(copies) < 2:
+            raise Reject("no duplicate to sell")
+        sold = copies[-1]
+        u["cards"].remove(sold)
+        gained = SELL_VALUE[sold["rarity"]]
+        u["tokens"] += gained
+        return {"tokens_gained": gained, "balance": u["tokens"], "rarity": sold["rarity"],
+                "sold_serial": sold["serial_no"]}
+
+    def sell_all_dupes(self, p):
+        u = self.user(p["user_id"])
+        keep, sold, gained = [], 0, 0
+        seen = set()
+        for c in u["cards"]:
+            if c["card_id"] in seen:
+                sold += 1
+                gained += SELL_VALUE[c["rarity"]]
+            else:
+                seen.add(c["card_id"])
+                keep.append(c)
+        u["cards"] = keep
+        u["tokens"] += gained
+        return {"sold_count": sold, "tokens_gained": gained, "balance": u["tokens"]}
+
+    def craft(self, p):
+        u = self.user(p["user_id"])
+        card = self.by_id.get(str(p.get("card_id") or "").strip())
+        if card is None:
+            raise Reject("unknown card_id")
+        qty = max(1, int(p.get("quantity") or 1))
+        cost = CRAFT_COST[card["rarity"]] * qty
+        if u["tokens"] < cost:
+            raise Reject(f"not enough tokens (need {cost})")
+        u["tokens"] -= cost
+        made = [self._mint(card) for _ in range(qty)]
+        u["cards"].extend(made)
+        return {"results": made, "tokens_spent": cost, **self._balances(u)}
+
+    def shop(self, p):
+        if p.get("op") == "list":
+            return {"items": self.shop_items}
+        u = self.user(p["user_id"])
+        sku = p.get("item_id") or p.get("sku")
+        item = next((it for it in self.shop_items if it["sku"] == sku), None)
+        if item is None:
+            raise Reject("unknown item")
+        qty = max(1, int(p.get("quantity") or 1))
+        cost = item["price"]["value"] * qty
+        if u["tokens"] < cost:
+            raise Reject(f"not enough tokens (need {cost})")
+        u["tokens"] -= cost
+        if sku == "TICKETS10":
+            u["tickets"] += 10 * qty
+            bought = [{"name": "10 Tickets"}] * qty
+        else:
+            bought = [self._mint(self.by_id[sku]) for _ in range(qty)]
+            u["cards"].extend(bought)
+        return {"items": bought, "tokens_spent": cost, **self._balances(u)}
+
+    def grant(self, p):
+        u = self.user(p["user_id"])
+        u["tickets"] += int(p.get("amount") or 0)
+        return {"balance": u["tickets"]}
+
+    def grant_all(self, p):
+        for u in self.users.values():
+            u["tickets"] += int(p.get("amount") or 0)
+        return {"affected": len(self.users)}
+
+    def balance(self, p):
+        u = self.user(p["user_id"])
+        return {"tickets": u["tickets"], "tokens": u["tokens"]}
+
+    def dex_list(self, _p):
+        return {"items": self.catalog}
+
+    def dex_autocomplete(self, p):
+        q = str(p.get("query") or "").lower()
+        hits = [c for c in self.catalog if q in f"{c['card_id']} {c['name']} {c['club']}".lower()]
+        return {"items": [
+            {"label": f"{c['name']} · {c['club']} · {c['rarity']}", "value": c["card_id"], **c}
+            for c in hits[: int(p.get("limit") or 25)]
+        ]}
+
+class Reject(Exception):
+    """Answered as {ok: false, error}."""
+
+ACTIONS = ("open_base", "open_pack", "starter", "collection", "last_draw", "sell", "sell_all_dupes",
+           "craft", "shop", "grant", "grant_all", "balance", "dex_list", "dex_autocomplete")
+
+def make_app(cfg: MockConfig | None = None) -> web.Application:
+    cfg = cfg or MockConfig()
+    state = GameState(cfg)
+    stats: Counter = Counter()
+    rng = random.Random(cfg.seed)
+
+    async def handle(req: web.Request):
+        if cfg.secret and req.headers.get("X-API-Secret") != cfg.secret:
+            return web.json_response({"ok": False, "error": "unauthorized"}, status=401)
+        try:
+            body = await req.json()
+        except Exception:
+            return web.json_response({"ok": False, "error": "bad json"}, status=400)
+        action = body.pop("action", "")
+        stats[action] += 1
+        base = cfg.action_latency.get(action, cfg.latency_ms)
+        await asyncio.sleep(max(0.0, base + rng.uniform(-cfg.jitter_ms, cfg.jitter_ms)) / 1000)
+        roll = rng.random()
+        if roll < cfg.timeout_rate:
+            stats["fault:timeout"] += 1
+            await asyncio.sleep(cfg.hang_s)
+        elif roll < cfg.timeout_rate + cfg.error_rate:
+            stats["fault:503"] += 1
+            return web.Response(status=503, text="injected upstream failure")
+        elif roll < cfg.timeout_rate + cfg.error_rate + cfg.reject_rate:
+            stats["fault:reject"] += 1
+            return web.json_response({"ok": False, "error": "injected rejection"})
+        fn = getattr(state, action, None) if action in ACTIONS else None
+        if fn is None:
+            return web.json_response({"ok": False, "error": f"unknown action: {action}"}, status=400)
+        try:
+            return web.json_response({"ok": True, "data": fn(body)})
+        except Reject as e:
+            return web.json_response({"ok": False, "error": str(e)})
+
+    async def head(_req: web.Request):   # bot's pool warm-up
+        return web.Response()
+
+    async def art(_req: web.Request):
+        stats["art"] += 1
+        return web.Response(body=ART_PNG, content_type="image/png", headers={"ETag": '"mock-art"'})
+
+    app = web.Application()
+    app.router.add_post("/api", handle)
+    app.router.add_route("HEAD", "/api", head)
+    app.router.add_get("/art/{name}", art)
+    app["state"], app["stats"], app["config"] = state, stats, cfg
+    return app
+
+async def start(cfg: MockConfig | None = None, host: str = "127.0.0.1", port: int = 8787) -> web.AppRunner:
+    cfg = cfg or MockConfig()
+    cfg.art_base = cfg.art_base or f"http://{host}:{port}/art"
+    runner = web.AppRunner(make_app(cfg), access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
+
+def config_from_args(ns: argparse.Namespace) -> MockConfig:
+    return MockConfig(
+        latency_ms=ns.latency_ms, jitter_ms=ns.jitter_ms, action_latency=json.loads(ns.action_latency or "{}"),
+        error_rate=ns.error_rate, reject_rate=ns.reject_rate, timeout_rate=ns.timeout_rate, hang_s=ns.hang_s,
+        secret=ns.secret, seed=ns.seed,
+    )
+
+def add_args(ap: argparse.ArgumentParser):
+    ap.add_argument("--latency-ms", type=float, default=30.0)
+    ap.add_argument("--jitter-ms", type=float, default=10.0)
+    ap.add_argument("--action-latency", default="", help='JSON {"action": ms}')
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    ap.add_argument("--reject-rate", type=float, default=0.0)
+    ap.add_argument("--timeout-rate", type=float, default=0.0)
+    ap.add_argument("--hang-s", type=float, default=60.0)
+    ap.add_argument("--secret", default="")
+    ap.add_argument("--seed", type=int, default=None)
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8787)
+    add_args(ap)
+    ns = ap.parse_args()
+    cfg = config_from_args(ns)
+    cfg.art_base = f"http://{ns.host}:{ns.port}/art"
+    print(f"mock Worker on http://{ns.host}:{ns.port}/api")
+    web.run_app(make_app(cfg), host=ns.host, port=ns.port, access_log=None, print=None)
+
+if __name__ == "__main__":
+    main()
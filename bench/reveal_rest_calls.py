@@ -0,0 +1,112 @@
+"""Count Discord REST calls for one full reveal of a pack.
+
+Drives start_reveal_session (and RevealState's buttons in manual mode) with
+fake interactions that only count calls, so it needs no token, gateway or Worker.
+The legacy column replays the reveal flow from before the single-edit clicks
+(defer, strip the view, edit, and a final edit to disable) the same way, so the
+before and after numbers both come from this script.
+
+    python bench/reveal_rest_calls.py [pack_size] [manual|auto|instant|legacy|all]
+"""
+import asyncio, os, sys, tempfile
+from collections import Counter
+from pathlib import Path
+
+from fakes import Calls, FakeChannel, FakeInteraction
+
+os.environ.setdefault("DISCORD_TOKEN", "bench")
+os.environ.setdefault("API_BASE", "http://127.0.0.1:9/api")
+os.environ["HYPE_CHANNEL_ID"] = "0"
+os.environ["AUTO_REVEAL_DELAY_S"] = "0"
+os.environ["ART_PREFETCH"] = "0"
+os.environ["DATA_DIR"] = tempfile.mkdtemp(prefix="tlk-bench-")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import bot  # noqa: E402
+import discord  # noqa: E402
+
+def sample_pack(n: int) -> list[dict]:
+    rarities = ["N", "R", "AR", "SR", "SSR"]
+    return [
+        {"card_id": f"PLR{i:03d}", "name": f"Player {i}", "rarity": rarities[i % 5],
+         "serial_no": i + 1, "image_ref": f"https://cdn.example/cards/{i}.png"}
+        for i in range(n)
+    ]
+
+# --- legacy reference implementation (the reveal flow before one edit per click) ---
+class LegacyReveal(discord.ui.View):
+    """The old RevealState's REST calls, verbatim; hype is left out (HYPE_CHANNEL_ID=0 here too)."""
+
+    def __init__(self, pulls_sorted: list[dict], owner_id: int, pack_name: str):
+        super().__init__(timeout=600)
+        self.pulls_sorted = list(pulls_sorted)
+        self.queue = list(pulls_sorted)
+        self.owner_id = owner_id
+        self.pack_name = pack_name
+        self.total = len(pulls_sorted)
+        self.revealed = 0
+        self.done = False
+
+    async def _post_summary(self, itx):
+        desc = "\n".join(bot.summary_line(bot._normalize_card(r)) for r in self.pulls_sorted)
+        await itx.followup.send(embed=discord.Embed(title=f"{self.pack_name} — Results", description=desc, color=0x57F287))
+
+    @discord.ui.button(label="Reveal Next", style=discord.ButtonStyle.primary)
+    async def reveal_next(self, itx, _button):
+        await itx.response.defer(thinking=False)
+        if self.done or not self.queue:
+            await itx.message.edit(view=None)
+            return
+        card = self.queue.pop(0)
+        self.revealed += 1
+        await itx.message.edit(view=None)
+        emb = discord.Embed(title=bot.card_title(bot._normalize_card(card)), description=f"Card {self.revealed}/{self.total}")
+        await itx.message.edit(embed=emb, view=self)
+        if self.queue:
+            return
+        self.done = True
+        for child in self.children:
+            child.disabled = True
+        await itx.message.edit(view=self)
+        await self._post_summary(itx)
+
+async def legacy_reveal_pack(pack_size: int) -> Counter:
+    calls = Calls()
+    channel = FakeChannel(calls)
+    itx = FakeInteraction(calls, channel)
+    pulls = sorted(sample_pack(pack_size), key=lambda r: bot.RARITY_ORDER.get(r.get("rarity") or "", -1))
+    await itx.followup.send(f"🎴 **Base Pack** for {itx.user.mention} — let’s reveal here!")
+    view = LegacyReveal(pulls, itx.user.id, "Base Pack")
+    msg = await channel.send(embed=discord.Embed(title="Base Pack — Tap to reveal"), view=view)
+    while not view.done:
+        await view.children[0].callback(FakeInteraction(calls, channel, msg))
+    return calls
+
+async def reveal_pack(pack_size: int, mode: str = "manual") -> Counter:
+    calls = Calls()
+    channel = FakeChannel(calls)
+    await bot.start_reveal_session(FakeInteraction(calls, channel), sample_pack(pack_size), "Base Pack", mode=mode)
+    await asyncio.gather(*getattr(bot, "_background_tasks", ()))
+    msg = channel.last
+    # Manual mode: keep pressing "Reveal Next" (a custom_id-routed DynamicItem) until it's disabled.
+    while msg is not None and msg.view is not None and not msg.view.children[0].item.disabled:
+        await msg.view.children[0].callback(FakeInteraction(calls, channel, msg))
+    return calls
+
+def main():
+    pack_size = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    arg = sys.argv[2] if len(sys.argv) > 2 else "manual"
+    modes = ("legacy", "manual", "auto", "instant") if arg == "all" else ("legacy", "manual") if arg == "manual" else (arg,)
+    totals = {}
+    for mode in modes:
+        calls = asyncio.run(legacy_reveal_pack(pack_size) if mode == "legacy" else reveal_pack(pack_size, mode))
+        totals[mode] = sum(calls.values())
+        print(f"[{mode}]")
+        for what, n in sorted(calls.items()):
+            print(f"  {what:24s} {n}")
+        print(f"  {'TOTAL':24s} {totals[mode]}  ({pack_size}-card pack)")
+    if "legacy" in totals and "manual" in totals:
+        print(f"manual reveal: {totals['legacy']} -> {totals['manual']} REST calls")
+
+if __name__ == "__main__":
+    main()
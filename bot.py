@@ -1,4 +1,7 @@
-import os, aiohttp, asyncio, time, json
+import os, sys, io, aiohttp, asyncio, time, json, re, bisect, heapq, uuid, random, functools, contextlib, contextvars, sqlite3, hashlib, logging, signal
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from aiohttp import web
 from pathlib import Path
 from dotenv import load_dotenv, find_dotenv
 
@@ -29,10 +32,32 @@ if not API_BASE:
     raise RuntimeError("API_BASE is missing. Set it to your Worker URL (include /api).")
 
 CARD_BACK_URL = os.getenv("CARD_BACK_URL")  # optional
+DATA_DIR = Path(os.getenv("DATA_DIR") or Path(__file__).with_name("data"))  # local state (prefs, ...)
+
+# Sharding is opt-in. SHARDED=1 runs one AutoShardedBot with Discord's recommended
+# shard count (or SHARD_COUNT); cluster.py sets SHARD_IDS/SHARD_COUNT/CLUSTER_ID so
+# each process owns a slice of the shards.
+SHARD_IDS   = [int(x) for x in os.getenv("SHARD_IDS", "").split(",") if x.strip()]
+SHARD_COUNT = int(os.getenv("SHARD_COUNT", "0"))
+SHARDED     = os.getenv("SHARDED", "0") == "1" or bool(SHARD_IDS)
+CLUSTER_ID  = int(os.getenv("CLUSTER_ID", "0"))
+if SHARD_IDS and not SHARD_COUNT:
+    raise RuntimeError("SHARD_IDS needs SHARD_COUNT (the total across all clusters).")
 
 INTENTS = discord.Intents.default()
-bot = commands.Bot(command_prefix="!", intents=INTENTS)
+if SHARDED:
+    bot = commands.AutoShardedBot(command_prefix="!", intents=INTENTS,
+                                  shard_count=SHARD_COUNT or None, shard_ids=SHARD_IDS or None)
+else:
+    bot = commands.Bot(command_prefix="!", intents=INTENTS)
 bot.http_session = None
+bot.dex_task = None
+bot.metrics_runner = None
+bot.sync_task = None
+bot.commands_synced = False
+bot.ready_s = None           # seconds from import to the first READY
+bot.first_command_s = None   # seconds from import to the first slash command
+BOOT_T0 = time.perf_counter()
 
 # --- Packs from env ---
 def _load_pack_actions():
@@ -51,10 +76,357 @@ PACK_ACTIONS = _load_pack_actions()
 PACK_NAMES   = list(PACK_ACTIONS.keys())
 print("PACK_ACTIONS =", PACK_ACTIONS)
 
+# --- Metrics (Prometheus text format, served from the bot's own loop) ---
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9108"))  # 0 disables the endpoint
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+class Metrics:
+    """Tiny in-process registry: counters, gauges and fixed-bucket histograms keyed by label tuples."""
+
+    def __init__(self):
+        self.counters: dict[str, dict[tuple, float]] = defaultdict(lambda: defaultdict(float))
+        self.gauges: dict[str, dict[tuple, float]] = defaultdict(lambda: defaultdict(float))
+        self.hists: dict[str, dict[tuple, list]] = defaultdict(dict)  # labels -> [bucket counts..., sum, count]
+        self.help: dict[str, str] = {}
+        self.collectors: list = []   # callables run at scrape time -> [(name, labels, value)] gauges
+
+    def inc(self, name: str, labels: tuple = (), v: float = 1.0):
+        self.counters[name][labels] += v
+
+    def gauge(self, name: str, labels: tuple = (), v: float = 0.0):
+        self.gauges[name][labels] = v
+
+    def gauge_add(self, name: str, labels: tuple = (), v: float = 1.0):
+        self.gauges[name][labels] += v
+
+    def observe(self, name: str, labels: tuple, value: float):
+        h = self.hists[name].get(labels)
+        if h is None:
+            h = self.hists[name][labels] = [0] * len(LATENCY_BUCKETS) + [0.0, 0]
+        i = bisect.bisect_left(LATENCY_BUCKETS, value)
+        if i < len(LATENCY_BUCKETS):
+            h[i] += 1
+        h[-2] += value
+        h[-1] += 1
+
+    @staticmethod
+    def _fmt(labels: tuple, extra: str = "") -> str:
+        parts = [f'{k}="{v}"' for k, v in labels]
+        if extra:
+            parts.append(extra)
+        return "{" + ",".join(parts) + "}" if parts else ""
+
+    def render(self) -> str:
+        for collect in self.collectors:
+            try:
+                for name, labels, v in collect():
+                    self.gauge(name, labels, v)
+            except Exception as e:
+                print("[metrics] collector failed:", e)
+        out = []
+        for kind, table in (("counter", self.counters), ("gauge", self.gauges)):
+            for name, series in table.items():
+                if name in self.help:
+                    out.append(f"# HELP {name} {self.help[name]}")
+                out.append(f"# TYPE {name} {kind}")
+                out.extend(f"{name}{self._fmt(lbl)} {v:g}" for lbl, v in series.items())
+        for name, series in self.hists.items():
+            if name in self.help:
+                out.append(f"# HELP {name} {self.help[name]}")
+            out.append(f"# TYPE {name} histogram")
+            for lbl, h in series.items():
+                acc = 0
+                for le, n in zip(LATENCY_BUCKETS, h):
+                    acc += n
+                    le_lbl = 'le="%g"' % le
+                    out.append(f"{name}_bucket{self._fmt(lbl, le_lbl)} {acc}")
+                inf_lbl = 'le="+Inf"'
+                out.append(f"{name}_bucket{self._fmt(lbl, inf_lbl)} {h[-1]}")
+                out.append(f"{name}_sum{self._fmt(lbl)} {h[-2]:.6f}")
+                out.append(f"{name}_count{self._fmt(lbl)} {h[-1]}")
+        return "\n".join(out) + "\n"
+
+metrics = Metrics()
+metrics.help.update({
+    "tlk_api_request_seconds":        "Worker round-trip latency per attempt",
+    "tlk_api_requests_total":         "Worker attempts by action and outcome",
+    "tlk_api_inflight":               "Worker requests currently on the wire",
+    "tlk_api_calls_total":            "call_sheet calls by how they were served (wire/cache/coalesced)",
+    "tlk_command_seconds":            "Slash command handler duration",
+    "tlk_command_first_followup_seconds": "Time from handler start to the first followup message",
+    "tlk_command_total":              "Slash command invocations by outcome",
+    "tlk_command_inflight":           "Slash command handlers currently running",
+    "tlk_autocomplete_seconds":       "Autocomplete latency by source (local index or remote)",
+    "tlk_art_requests_total":         "Card art lookups by result (hit/miss/revalidated/error)",
+    "tlk_gallery_render_seconds":     "Collection gallery grid render time (thread pool)",
+    "tlk_gallery_deadline_total":     "Collection replies sent text-only because the grid missed GALLERY_WAIT_S",
+    "tlk_boot_ready_seconds":         "Process start to first gateway READY",
+    "tlk_boot_first_command_seconds": "Process start to the first slash command",
+    "tlk_command_sync_total":         "Command tree syncs by result (synced/skipped/error)",
+    "tlk_shard_latency_seconds":      "Gateway heartbeat latency per shard",
+    "tlk_shard_events_total":         "Gateway dispatch events received per shard and event type",
+    "tlk_shard_connects_total":       "Gateway (re)connects per shard",
+    "tlk_state_errors_total":         "Shared state backend failures (fell back to local state)",
+    "tlk_state_invalidations_total":  "Cache invalidations exchanged with other clusters",
+    "tlk_rate_limited_total":         "Waits imposed by shared rate-limit buckets",
+    "tlk_slow_callbacks_total":       "Event loop callbacks slower than SLOW_CALLBACK_MS (debug mode only)",
+})
+
+async def _metrics_handler(_req):
+    return web.Response(text=metrics.render(), content_type="text/plain", charset="utf-8")
+
+async def start_metrics_server():
+    if not METRICS_PORT:
+        return None
+    app = web.Application()
+    app.router.add_get("/metrics", _metrics_handler)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, METRICS_HOST, METRICS_PORT).start()
+    print(f"📈 Metrics on http://{METRICS_HOST}:{METRICS_PORT}/metrics")
+    return runner
+
+class _FirstFollowup:
+    """Wraps an Interaction's followup webhook to time the first send()."""
+    __slots__ = ("_hook", "_on_first")
+
+    def __init__(self, hook, on_first):
+        self._hook = hook
+        self._on_first = on_first
+
+    async def send(self, *args, **kwargs):
+        if self._on_first is not None:
+            cb, self._on_first = self._on_first, None
+            cb()
+        return await self._hook.send(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._hook, name)
+
+# The slash-command interaction being served by the current task (set by @instrumented),
+# so deep helpers like the admission queue can talk back to the user.
+current_interaction: contextvars.ContextVar[discord.Interaction | None] = contextvars.ContextVar("current_interaction", default=None)
+# [status] of the running command; handlers that catch their own errors flip it via reply_error().
+_command_status: contextvars.ContextVar[list | None] = contextvars.ContextVar("command_status", default=None)
+
+def mark_command_error(status: str = "error"):
+    """Record a failure the handler caught itself ("rejected" = the Worker said no)."""
+    st = _command_status.get()
+    if st is not None:
+        st[0] = status
+
+async def reply_error(interaction: discord.Interaction, content: str):
+    """Ephemeral error followup that also counts the command as failed in tlk_command_total."""
+    mark_command_error()
+    return await interaction.followup.send(content, ephemeral=True)
+
+def instrumented(func):
+    """Record latency, outcome, in-flight and time-to-first-followup for a slash command.
+       Goes directly above `async def` so app_commands decorators land on the wrapper."""
+    @functools.wraps(func)
+    async def wrapper(interaction: discord.Interaction, *args, **kwargs):
+        cmd = interaction.command.name if interaction.command else func.__name__
+        lbl = (("command", cmd),)
+        t0 = time.perf_counter()
+        if bot.first_command_s is None:
+            bot.first_command_s = t0 - BOOT_T0
+            metrics.gauge("tlk_boot_first_command_seconds", (), bot.first_command_s)
+            print(f"[boot] first command /{cmd} {bot.first_command_s:.2f}s after start")
+        # followup is a cached slot; pre-seed it with the timing proxy.
+        interaction._cs_followup = _FirstFollowup(
+            interaction.followup,
+            lambda: metrics.observe("tlk_command_first_followup_seconds", lbl, time.perf_counter() - t0),
+        )
+        metrics.gauge_add("tlk_command_inflight", lbl, 1)
+        token = current_interaction.set(interaction)
+        status = ["ok"]
+        st_token = _command_status.set(status)
+        try:
+            return await func(interaction, *args, **kwargs)
+        except Exception:
+            status[0] = "error"
+            raise
+        finally:
+            _command_status.reset(st_token)
+            current_interaction.reset(token)
+            metrics.gauge_add("tlk_command_inflight", lbl, -1)
+            metrics.observe("tlk_command_seconds", lbl, time.perf_counter() - t0)
+            metrics.inc("tlk_command_total", lbl + (("status", status[0]),))
+    return wrapper
+
+# --- JSON codec (orjson when installed, stdlib otherwise; JSON_CODEC=json forces stdlib) ---
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None and os.getenv("JSON_CODEC", "orjson") != "json":
+    JSON_CODEC = "orjson"
+    _ORJSON_OPTS = orjson.OPT_NON_STR_KEYS
+
+    def json_loads(data: bytes | str):
+        return orjson.loads(data)
+
+    def json_dumpb(obj, sort_keys: bool = False) -> bytes:
+        return orjson.dumps(obj, default=str, option=_ORJSON_OPTS | (orjson.OPT_SORT_KEYS if sort_keys else 0))
+
+    def json_dumps(obj, sort_keys: bool = False) -> str:
+        return json_dumpb(obj, sort_keys).decode()
+else:
+    JSON_CODEC = "json"
+
+    def json_loads(data: bytes | str):
+        return json.loads(data)   # stdlib accepts UTF-8 bytes directly
+
+    def json_dumps(obj, sort_keys: bool = False) -> str:
+        return json.dumps(obj, sort_keys=sort_keys, separators=(",", ":"), default=str)
+
+    def json_dumpb(obj, sort_keys: bool = False) -> bytes:
+        return json_dumps(obj, sort_keys).encode()
+
+# --- Local state files ---
+# DATA_DIR is shared by every cluster process (cluster.py); files only one process
+# may own (the SQLite reveal store, the art disk cache, the command sync state)
+# live in PROCESS_DIR instead.
+PROCESS_DIR = DATA_DIR / f"cluster-{CLUSTER_ID}" if SHARD_IDS else DATA_DIR
+
+try:
+    import fcntl
+except ImportError:   # Windows: single process only, no locking needed
+    fcntl = None
+
+class SharedJsonFile:
+    """A JSON object on disk that sibling cluster processes read and update.
+
+    Reads reload the file when it changed (checked at most once a second); writes
+    are read-modify-write under an exclusive flock, so no process drops keys
+    another one wrote.
+    """
+
+    def __init__(self, path: Path, label: str):
+        self.path, self.label = path, label
+        self.data: dict = {}
+        self._mtime: int | None = None
+        self._checked = 0.0
+        self._load()
+
+    def _load(self):
+        try:
+            mtime = self.path.stat().st_mtime_ns
+            if mtime != self._mtime:
+                self.data, self._mtime = json.loads(self.path.read_text("utf-8")), mtime
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"[{self.label}] unreadable, keeping what we have:", e)
+
+    def fresh(self) -> dict:
+        now = time.monotonic()
+        if now - self._checked >= 1.0:
+            self._checked = now
+            self._load()
+        return self.data
+
+    @contextlib.contextmanager
+    def _locked(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path.with_suffix(".lock"), "a") as fh:
+            if fcntl is not None:
+                fcntl.flock(fh, fcntl.LOCK_EX)
+            yield
+
+    def update(self, mutate):
+        """mutate(data) on the latest on-disk copy, then write it back atomically."""
+        with self._locked():
+            self._load()
+            mutate(self.data)
+            tmp = self.path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(self.data, separators=(",", ":")), "utf-8")
+            tmp.replace(self.path)
+            self._mtime = self.path.stat().st_mtime_ns
+
 # --- HTTP session ---
+HTTP_POOL_LIMIT       = int(os.getenv("HTTP_POOL_LIMIT", "64"))       # total sockets
+HTTP_POOL_PER_HOST    = int(os.getenv("HTTP_POOL_PER_HOST", "32"))    # sockets to the Worker
+HTTP_KEEPALIVE_S      = float(os.getenv("HTTP_KEEPALIVE_S", "75"))    # idle keep-alive reuse window
+HTTP_DNS_TTL_S        = int(os.getenv("HTTP_DNS_TTL_S", "300"))
+HTTP_WARM_CONNECTIONS = int(os.getenv("HTTP_WARM_CONNECTIONS", "2"))  # sockets opened in on_ready
+
+# (connect, read) budgets in seconds per action group. Autocomplete must answer
+# inside Discord's 3s window; everything else must finish long before the
+# 15-minute followup token expires.
+DEFAULT_TIMEOUTS = {
+    "open":         (5.0, 25.0),
+    "autocomplete": (1.0, 1.5),
+    "collection":   (3.0, 10.0),
+    "default":      (3.0, 15.0),
+}
+ACTION_GROUPS = {
+    "open_pack":        "open",
+    "starter":          "open",
+    "dex_autocomplete": "autocomplete",
+    "collection":       "collection",
+    "last_draw":        "collection",
+}
+
+def _load_timeouts():
+    """Env var HTTP_TIMEOUTS may override groups with [connect, read] pairs.
+       Example: {"open":[5,40],"autocomplete":[1,1.5]} """
+    out = dict(DEFAULT_TIMEOUTS)
+    raw = (os.getenv("HTTP_TIMEOUTS", "") or "").strip()
+    try:
+        m = json.loads(raw) if raw else {}
+        if isinstance(m, dict):
+            for k, v in m.items():
+                out[str(k)] = (float(v[0]), float(v[1]))
+    except Exception as e:
+        print("HTTP_TIMEOUTS ignored:", e)
+    return {
+        k: aiohttp.ClientTimeout(total=c + r, connect=c, sock_connect=c, sock_read=r)
+        for k, (c, r) in out.items()
+    }
+
+HTTP_TIMEOUTS = _load_timeouts()
+
+def _action_group(action: str) -> str:
+    if action.startswith("open_"):
+        return ACTION_GROUPS.get(action, "open")
+    return ACTION_GROUPS.get(action, "default")
+
+def _timeout_for(action: str) -> aiohttp.ClientTimeout:
+    return HTTP_TIMEOUTS.get(_action_group(action)) or HTTP_TIMEOUTS["default"]
+
 async def _ensure_session():
     if bot.http_session is None or bot.http_session.closed:
-        bot.http_session = aiohttp.ClientSession()
+        connector = aiohttp.TCPConnector(
+            limit=HTTP_POOL_LIMIT,
+            limit_per_host=HTTP_POOL_PER_HOST,
+            ttl_dns_cache=HTTP_DNS_TTL_S,
+            keepalive_timeout=HTTP_KEEPALIVE_S,
+            force_close=False,           # HTTP/1.1 keep-alive reuse
+            enable_cleanup_closed=True,
+        )
+        bot.http_session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=HTTP_TIMEOUTS["default"],
+            headers={"Connection": "keep-alive"},
+            json_serialize=json_dumps,
+        )
+
+async def _warm_http_pool():
+    """Open a few keep-alive sockets to the Worker so the first /open skips DNS + TLS."""
+    await _ensure_session()
+    url = API_BASE.rstrip("/")
+    async def _one():
+        try:
+            async with bot.http_session.head(url, timeout=HTTP_TIMEOUTS["default"]) as resp:
+                await resp.read()
+        except Exception as e:
+            print("[http] warmup failed:", e)
+    t0 = time.perf_counter()
+    await asyncio.gather(*(_one() for _ in range(max(0, HTTP_WARM_CONNECTIONS))))
+    print(f"[http] pool warmed ({HTTP_WARM_CONNECTIONS} conns) in {(time.perf_counter() - t0) * 1000:.0f} ms")
 
 # --- Guards ---
 def in_command_channel(interaction: discord.Interaction) -> bool:
@@ -69,8 +441,554 @@ async def ensure_channel(interaction: discord.Interaction) -> bool:
         await interaction.followup.send(f"Please use commands in <#{COMMAND_CHANNEL_ID}>.", ephemeral=True)
     return False
 
+# --- API errors ---
+class APIError(RuntimeError):
+    """Base for Worker failures. `retryable` marks errors a replay may fix."""
+    retryable = False
+
+    def __init__(self, msg: str, *, action: str = "", status: int | None = None):
+        super().__init__(msg)
+        self.action = action
+        self.status = status
+
+class APITimeout(APIError):
+    retryable = True
+
+class APIUnavailable(APIError):
+    """5xx, connection reset, DNS failure, ..."""
+    retryable = True
+
+class APIUnsent(APIUnavailable):
+    """Could not connect: the request never reached the Worker, so any action may be replayed."""
+
+class APIBadResponse(APIError):
+    """Non-JSON body — usually a gateway error page."""
+    retryable = True
+
+class APIRejected(APIError):
+    """4xx or ok:false: the Worker understood and said no. Never retried."""
+
+class CircuitOpen(APIError):
+    pass
+
+class APIOverloaded(APIError):
+    """Waited too long for an admission slot; the Worker was never called."""
+
+# --- Retry + circuit breaker ---
+RETRY_ATTEMPTS   = int(os.getenv("RETRY_ATTEMPTS", "3"))         # total tries for idempotent actions
+RETRY_BASE_S     = float(os.getenv("RETRY_BASE_S", "0.25"))
+RETRY_CAP_S      = float(os.getenv("RETRY_CAP_S", "4"))
+BREAKER_FAILS    = int(os.getenv("BREAKER_FAILS", "5"))          # consecutive transient failures to trip
+BREAKER_COOLDOWN = float(os.getenv("BREAKER_COOLDOWN_S", "30"))
+NO_RETRY_GROUPS  = {"autocomplete"}                               # 3s deadline leaves no room to retry
+WORKER_DEDUPES_REQUEST_ID = os.getenv("WORKER_DEDUPES_REQUEST_ID", "0") == "1"  # set once the Worker replays keyed mutations
+
+class CircuitBreaker:
+    """closed → open after N consecutive transient failures → half-open (one probe) after cooldown."""
+
+    def __init__(self, threshold: int, cooldown: float):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = 0.0
+        self.state = "closed"
+        self._probing = False
+
+    def allow(self) -> bool:
+        if self.state == "closed":
+            return True
+        if self.state == "open" and time.monotonic() - self.opened_at >= self.cooldown:
+            self.state = "half_open"
+        if self.state == "half_open" and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.state = "closed"
+        self._probing = False
+
+    def abort_probe(self):
+        self._probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._probing = False
+        if self.state == "half_open" or self.failures >= self.threshold:
+            if self.state != "open":
+                print(f"[api] circuit OPEN after {self.failures} failures")
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+    def retry_after(self) -> float:
+        return max(0.0, self.cooldown - (time.monotonic() - self.opened_at))
+
+breaker = CircuitBreaker(BREAKER_FAILS, BREAKER_COOLDOWN)
+
+def _backoff(attempt: int) -> float:
+    """Full-jitter exponential backoff."""
+    return random.uniform(0, min(RETRY_CAP_S, RETRY_BASE_S * (2 ** attempt)))
+
+# --- Admission control (global concurrency cap with priority lanes) ---
+API_MAX_CONCURRENCY = int(os.getenv("API_MAX_CONCURRENCY", "16"))
+API_QUEUE_TIMEOUT_S = float(os.getenv("API_QUEUE_TIMEOUT_S", "60"))
+QUEUE_NOTICE_S      = float(os.getenv("QUEUE_NOTICE_S", "2"))   # queued longer than this -> tell the user
+# Groups whose caller is gone long before API_QUEUE_TIMEOUT_S: Discord drops an
+# autocomplete after 3s, so a slot it gets later would only load the Worker.
+QUEUE_TIMEOUTS = {"autocomplete": float(os.getenv("AUTOCOMPLETE_QUEUE_TIMEOUT_S", "1.0"))}
+
+LANES = ("interactive", "user", "bulk")   # served strictly in this order
+LANE_BY_ACTION = {
+    "dex_autocomplete": "interactive",
+    "balance":          "interactive",
+    "grant":            "bulk",
+    "grant_all":        "bulk",
+    "dex_list":         "bulk",   # DEX_CATALOG_ACTION is added below
+}
+
+class Admission:
+    """Counting semaphore whose waiters are woken by (lane, arrival) order."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.active = 0
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []  # heap
+        self._seq = 0
+
+    def depth(self, lane: int | None = None) -> int:
+        return sum(1 for p, _, f in self._waiters if not f.done() and (lane is None or p == lane))
+
+    def position(self, prio: int, seq: int) -> int:
+        return 1 + sum(1 for p, q, f in self._waiters if (p, q) < (prio, seq) and not f.done())
+
+    async def acquire(self, prio: int, on_queued=None, timeout: float = API_QUEUE_TIMEOUT_S):
+        if self.active < self.capacity and not self.depth():
+            self.active += 1
+            return
+        self._seq += 1
+        entry = (prio, self._seq, asyncio.get_running_loop().create_future())
+        heapq.heappush(self._waiters, entry)
+        notice = None
+        if on_queued is not None:
+            notice = asyncio.get_running_loop().call_later(
+                QUEUE_NOTICE_S, lambda: entry[2].done() or on_queued(self.position(prio, entry[1])))
+        try:
+            await asyncio.wait_for(asyncio.shield(entry[2]), timeout)
+        except BaseException:
+            if entry[2].done() and not entry[2].cancelled():
+                self.release()   # slot was handed over just as we gave up
+            else:
+                entry[2].cancel()
+            raise
+        finally:
+            if notice is not None:
+                notice.cancel()
+
+    def release(self):
+        self.active -= 1
+        while self._waiters:
+            _, _, fut = heapq.heappop(self._waiters)
+            if not fut.done():
+                self.active += 1
+                fut.set_result(None)
+                break
+
+admission = Admission(API_MAX_CONCURRENCY)
+
+def _lane(action: str) -> int:
+    return LANES.index(LANE_BY_ACTION.get(action, "user"))
+
+def _queued_notice(action: str):
+    itx = current_interaction.get()
+    if itx is None or not itx.response.is_done():
+        return None   # autocomplete / not deferred: nothing to follow up on
+    def _send_notice(pos: int):
+        async def _go():
+            try:
+                await itx.followup.send(f"⏳ The card server is busy — you're queued (position {pos}).", ephemeral=True)
+            except Exception as e:
+                print("[admission] queue notice failed:", e)
+        asyncio.ensure_future(_go())
+    return _send_notice
+
+@contextlib.asynccontextmanager
+async def _admitted(action: str):
+    prio = _lane(action)
+    lbl = (("lane", LANES[prio]),)
+    timeout = QUEUE_TIMEOUTS.get(_action_group(action), API_QUEUE_TIMEOUT_S)
+    t0 = time.perf_counter()
+    if WORKER_RPS > 0:
+        await _worker_rate_gate(action)
+    try:
+        await admission.acquire(prio, _queued_notice(action), timeout)
+    except asyncio.TimeoutError:
+        metrics.inc("tlk_admission_rejected_total", lbl)
+        raise APIOverloaded(f"Too many requests queued — {action} waited {timeout:g}s. Please try again.", action=action) from None
+    metrics.observe("tlk_admission_wait_seconds", lbl, time.perf_counter() - t0)
+    try:
+        yield
+    finally:
+        admission.release()
+
+def _collect_admission():
+    yield "tlk_admission_active", (), admission.active
+    for i, lane in enumerate(LANES):
+        yield "tlk_admission_queue_depth", (("lane", lane),), admission.depth(i)
+
+metrics.collectors.append(_collect_admission)
+
 # --- API call helper ---
+# Actions that never change Worker state. Only these may be coalesced; anything
+# else (open_*, starter, sell, craft, grant, shop buy, ...) always hits the wire.
+READ_ONLY_ACTIONS = {"collection", "last_draw", "dex_autocomplete", "dex_list", "balance"}
+
+def _is_read_only(action: str, payload: dict) -> bool:
+    if action == "shop":
+        return payload.get("op") == "list"
+    return action in READ_ONLY_ACTIONS
+
+def _is_idempotent(action: str, payload: dict) -> bool:
+    """Safe to replay after any transient failure: reads, and mutations carrying a
+       request_id once WORKER_DEDUPES_REQUEST_ID confirms the Worker dedupes on it."""
+    return _is_read_only(action, payload) or (WORKER_DEDUPES_REQUEST_ID and bool(payload.get("request_id")))
+
+def _request_key(action: str, payload: dict) -> str:
+    return action + ":" + json_dumps(payload, sort_keys=True)
+
+# --- Response cache (TTL + LRU for read-only actions) ---
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "2048"))
+DEFAULT_CACHE_TTLS = {"shop": 60.0, "collection": 30.0, "last_draw": 30.0, "dex_autocomplete": 300.0}
+
+def _load_cache_ttls():
+    """Env var CACHE_TTLS may override per-action TTL seconds (0 disables caching).
+       Example: {"shop":120,"collection":15} """
+    out = dict(DEFAULT_CACHE_TTLS)
+    raw = (os.getenv("CACHE_TTLS", "") or "").strip()
+    try:
+        m = json.loads(raw) if raw else {}
+        if isinstance(m, dict):
+            out.update({str(k): float(v) for k, v in m.items()})
+    except Exception as e:
+        print("CACHE_TTLS ignored:", e)
+    return out
+
+CACHE_TTLS = _load_cache_ttls()
+_MISS = object()
+
+class ResponseCache:
+    """Bounded LRU of Worker responses with a per-entry TTL and per-user invalidation."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._data: OrderedDict[str, tuple[float, str, object]] = OrderedDict()  # key -> (expires, user_id, value)
+        self._by_user: dict[str, set[str]] = {}
+        self._gen: dict[str, int] = {}   # bumped on invalidation; stale fetches must not repopulate
+        self._global_gen = 0
+        self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def generation(self, user_id: str) -> tuple[int, int]:
+        return self._global_gen, self._gen.get(user_id, 0)
+
+    def get(self, key: str):
+        ent = self._data.get(key)
+        if ent is None or ent[0] < time.monotonic():
+            if ent is not None:
+                self._drop(key)
+            self.misses += 1
+            return _MISS
+        self._data.move_to_end(key)
+        self.hits += 1
+        return ent[2]
+
+    def put(self, key: str, value, ttl: float, user_id: str, gen: tuple[int, int]):
+        if ttl <= 0 or gen != self.generation(user_id):
+            return
+        self._drop(key)
+        self._data[key] = (time.monotonic() + ttl, user_id, value)
+        if user_id:
+            self._by_user.setdefault(user_id, set()).add(key)
+        while len(self._data) > self.max_entries:
+            self._drop(next(iter(self._data)))
+            self.evictions += 1
+
+    def _drop(self, key: str):
+        ent = self._data.pop(key, None)
+        if ent and ent[1]:
+            keys = self._by_user.get(ent[1])
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_user[ent[1]]
+
+    def invalidate_user(self, user_id: str):
+        self._gen[user_id] = self._gen.get(user_id, 0) + 1
+        for key in list(self._by_user.pop(user_id, ())):
+            self._data.pop(key, None)
+        self.invalidations += 1
+
+    def invalidate_prefix(self, prefix: str):
+        for key in [k for k in self._data if k.startswith(prefix)]:
+            self._drop(key)
+        self.invalidations += 1
+
+    def invalidate_all_users(self):
+        self._global_gen += 1
+        for user_id in list(self._by_user):
+            for key in self._by_user.pop(user_id):
+                self._data.pop(key, None)
+        self.invalidations += 1
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._data), "max_entries": self.max_entries,
+            "hits": self.hits, "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            "evictions": self.evictions, "invalidations": self.invalidations,
+        }
+
+response_cache = ResponseCache(CACHE_MAX_ENTRIES)
+
+def _invalidate_after(action: str, payload: dict):
+    """Drop cached reads a mutating action may have made stale."""
+    if action == "grant_all":
+        response_cache.invalidate_all_users()
+        return
+    user_id = str(payload.get("user_id") or "")
+    if user_id:
+        response_cache.invalidate_user(user_id)
+    if action == "shop":
+        response_cache.invalidate_prefix("shop:")  # stock may have changed
+
+# --- Balance cache (kept current from mutation responses) ---
+BALANCE_TTL_S = float(os.getenv("BALANCE_TTL_S", "300"))
+BALANCE_CACHE_MAX = int(os.getenv("BALANCE_CACHE_MAX", "10000"))   # users kept; least recently updated go first
+CURRENCIES = ("tickets", "tokens")
+
+# Which balances a mutating action can change. Anything not listed may touch both.
+BALANCE_EFFECTS = {
+    "sell":           ("tokens",),
+    "sell_all_dupes": ("tokens",),
+    "grant":          ("tickets",),
+    "grant_all":      ("tickets",),
+    "starter":        (),
+}
+
+def _to_int(x):
+    try:
+        return int(float(x))
+    except Exception:
+        return None
+
+def _balance_effects(action: str) -> tuple[str, ...]:
+    if action.startswith("open_"):
+        return ("tickets",)
+    return BALANCE_EFFECTS.get(action, CURRENCIES)
+
+def _extract_balances(action: str, res) -> dict:
+    """Pull whatever tickets/tokens balances a Worker response carries."""
+    data = res.get("data", res) if isinstance(res, dict) else None
+    if not isinstance(data, dict):
+        return {}
+    out = {}
+    bal = data.get("balances")
+    if isinstance(bal, dict):
+        out["tickets"], out["tokens"] = bal.get("tickets"), bal.get("tokens")
+    if action == "balance":
+        out.setdefault("tickets", data.get("tickets"))
+        out.setdefault("tokens", data.get("tokens"))
+    for cur in CURRENCIES:
+        v = data.get(f"{cur}_balance")
+        if v is None:
+            v = data.get(f"balance_{cur}")
+        if v is not None:
+            out[cur] = v
+    # Bare "balance": sell reports tokens, grant reports tickets.
+    if data.get("balance") is not None and action in BALANCE_EFFECTS and len(BALANCE_EFFECTS[action]) == 1:
+        out.setdefault(BALANCE_EFFECTS[action][0], data["balance"])
+    return {k: n for k, v in out.items() if v is not None and (n := _to_int(v)) is not None}
+
+class BalanceCache:
+    """Per-user tickets/tokens, each currency tracked (and forgotten) independently.
+       Stale values are dropped on read; past `max_users` the least recently updated user goes."""
+
+    def __init__(self, ttl: float, max_users: int):
+        self.ttl = ttl
+        self.max_users = max_users
+        self._data: OrderedDict[str, dict[str, tuple[int, float]]] = OrderedDict()  # user -> currency -> (value, ts)
+        self.hits = self.misses = 0
+
+    def get(self, user_id: str) -> dict | None:
+        ent = self._data.get(user_id) or {}
+        now = time.monotonic()
+        for cur in [cur for cur, (_v, ts) in ent.items() if now - ts >= self.ttl]:
+            del ent[cur]
+        if all(cur in ent for cur in CURRENCIES):
+            self.hits += 1
+            return {cur: ent[cur][0] for cur in CURRENCIES}
+        if user_id in self._data and not ent:
+            del self._data[user_id]
+        self.misses += 1
+        return None
+
+    def update(self, user_id: str, values: dict):
+        if not user_id or not values:
+            return
+        now = time.monotonic()
+        ent = self._data.setdefault(user_id, {})
+        self._data.move_to_end(user_id)
+        for cur, v in values.items():
+            ent[cur] = (v, now)
+        while len(self._data) > self.max_users:
+            self._data.popitem(last=False)
+
+    def forget(self, user_id: str, currencies=CURRENCIES):
+        ent = self._data.get(user_id)
+        if ent:
+            for cur in currencies:
+                ent.pop(cur, None)
+            if not ent:
+                del self._data[user_id]
+
+    def forget_all(self, currencies=CURRENCIES):
+        for user_id in list(self._data):
+            self.forget(user_id, currencies)
+
+balance_cache = BalanceCache(BALANCE_TTL_S, BALANCE_CACHE_MAX)
+
+def _observe_mutation(action: str, payload: dict, res):
+    """Apply the balances a mutation returned; forget the ones it changed but didn't report."""
+    touched = _balance_effects(action)
+    if action == "grant_all":
+        balance_cache.forget_all(touched)
+        return
+    user_id = str(payload.get("user_id") or "")
+    if not user_id:
+        return
+    seen = _extract_balances(action, res) if res is not None else {}
+    balance_cache.forget(user_id, [c for c in touched if c not in seen])
+    balance_cache.update(user_id, seen)
+
+_inflight: dict[str, asyncio.Future] = {}
+
+def _collect_api_state():
+    st = response_cache.stats()
+    yield "tlk_cache_entries", (), st["entries"]
+    yield "tlk_cache_hits", (), st["hits"]
+    yield "tlk_cache_misses", (), st["misses"]
+    yield "tlk_cache_evictions", (), st["evictions"]
+    yield "tlk_balance_cache_hits", (), balance_cache.hits
+    yield "tlk_balance_cache_misses", (), balance_cache.misses
+    yield "tlk_singleflight_inflight", (), len(_inflight)
+    yield "tlk_circuit_open", (), 0 if breaker.state == "closed" else 1
+    yield "tlk_gateway_latency_seconds", (), bot.latency if bot.latency == bot.latency else 0.0  # NaN before connect
+
+metrics.collectors.append(_collect_api_state)
+
 async def call_sheet(action: str, payload: dict):
+    """POST an action to the Worker.
+
+    Read-only requests are served from `response_cache` when fresh, and identical
+    concurrent misses share one in-flight call (single-flight). Callers get a
+    shared result object and must treat it as read-only. Mutating actions always
+    hit the wire and invalidate the acting user's cached reads.
+    """
+    if not _is_read_only(action, payload):
+        metrics.inc("tlk_api_calls_total", (("action", action), ("source", "wire")))
+        res = None
+        try:
+            res = await _send(action, payload)
+            return res
+        finally:
+            _invalidate_after(action, payload)
+            _observe_mutation(action, payload, res)
+            if shared_state.shared:
+                _spawn(shared_state.publish({"action": action, "user_id": str(payload.get("user_id") or "")}))
+    key = _request_key(action, payload)
+    ttl = CACHE_TTLS.get(action, 0.0)
+    if ttl > 0:
+        hit = response_cache.get(key)
+        if hit is not _MISS:
+            metrics.inc("tlk_api_calls_total", (("action", action), ("source", "cache")))
+            return hit
+    fut = _inflight.get(key)
+    metrics.inc("tlk_api_calls_total", (("action", action), ("source", "wire" if fut is None else "coalesced")))
+    if fut is None:
+        fut = asyncio.ensure_future(_fetch_and_cache(action, payload, key, ttl))
+        _inflight[key] = fut
+        def _done(f, key=key):
+            _inflight.pop(key, None)
+            if not f.cancelled():
+                f.exception()  # mark retrieved even if every waiter was cancelled
+        fut.add_done_callback(_done)
+    # shield: one caller giving up must not cancel the request for the others
+    return await asyncio.shield(fut)
+
+async def _fetch_and_cache(action: str, payload: dict, key: str, ttl: float):
+    user_id = str(payload.get("user_id") or "")
+    gen = response_cache.generation(user_id)
+    res = await _send(action, payload)
+    if ttl > 0:
+        response_cache.put(key, res, ttl, user_id, gen)
+    if user_id and gen == response_cache.generation(user_id):
+        balance_cache.update(user_id, _extract_balances(action, res))
+    return res
+
+async def _send(action: str, payload: dict):
+    """One logical Worker call: circuit breaker, admission slot, jittered retries for idempotent actions
+       (and for any action whose request never reached the Worker)."""
+    replayable = _is_idempotent(action, payload)
+    attempts = RETRY_ATTEMPTS if _action_group(action) not in NO_RETRY_GROUPS else 1
+    lbl = (("action", action),)
+    for attempt in range(max(1, attempts)):
+        if not breaker.allow():
+            metrics.inc("tlk_api_requests_total", lbl + (("status", "CircuitOpen"),))
+            raise CircuitOpen(
+                f"The card server is having trouble right now — please try again in ~{int(breaker.retry_after()) + 1}s.",
+                action=action,
+            )
+        status = "ok"
+        try:
+            async with _admitted(action):
+                metrics.gauge_add("tlk_api_inflight", lbl, 1)
+                t0 = time.perf_counter()
+                try:
+                    res = await _post_action(action, payload)
+                finally:
+                    metrics.gauge_add("tlk_api_inflight", lbl, -1)
+                    metrics.observe("tlk_api_request_seconds", lbl, time.perf_counter() - t0)
+        except asyncio.CancelledError:
+            status = "cancelled"
+            breaker.abort_probe()
+            raise
+        except APIOverloaded:
+            status = "APIOverloaded"
+            breaker.abort_probe()  # never reached the Worker; says nothing about its health
+            raise
+        except APIError as e:
+            status = type(e).__name__
+            if not e.retryable:
+                breaker.record_success()  # the Worker answered; it is up
+                raise
+            breaker.record_failure()
+            if attempt + 1 >= attempts or not (replayable or isinstance(e, APIUnsent)):
+                raise  # a mutation that may have landed is left to the caller's by-key recovery
+        except Exception as e:
+            status = type(e).__name__
+            breaker.abort_probe()  # a bug on our side says nothing about the Worker, but must free the probe
+            raise
+        else:
+            breaker.record_success()
+            return res
+        finally:
+            metrics.inc("tlk_api_requests_total", lbl + (("status", status),))
+        await asyncio.sleep(_backoff(attempt))
+
+async def _post_action(action: str, payload: dict):
     await _ensure_session()
     url = API_BASE.rstrip("/")
     data = {"action": action, **payload}
@@ -78,33 +996,189 @@ async def call_sheet(action: str, payload: dict):
     if API_SECRET:
         headers["X-API-Secret"] = API_SECRET
 
-    async with bot.http_session.post(url, headers=headers, json=data) as resp:
-        text = await resp.text()
-        if resp.status >= 400:
-            raise RuntimeError(f"API {resp.status}: {text[:300]}")
-        try:
-            body = json.loads(text)
-        except Exception:
-            raise RuntimeError(f"API returned non-JSON: {text[:200]}")
-        if isinstance(body, dict) and "ok" in body and "data" in body:
-            if not body.get("ok", False):
-                err = body.get("error") or body.get("data")
-                raise RuntimeError(f"API error: {err}")
-            return body.get("data", {})
-        return body
+    try:
+        async with bot.http_session.post(url, headers=headers, data=json_dumpb(data), timeout=_timeout_for(action)) as resp:
+            raw = await resp.read()
+    except asyncio.TimeoutError:
+        raise APITimeout(f"API timeout: {action} exceeded its {_action_group(action)} budget", action=action)
+    except aiohttp.ClientConnectorError as e:
+        raise APIUnsent(f"API unreachable: {e}", action=action)
+    except aiohttp.ClientError as e:
+        raise APIUnavailable(f"API unreachable: {e}", action=action)
+    if resp.status >= 500:
+        raise APIUnavailable(f"API {resp.status}: {_snippet(raw, 300)}", action=action, status=resp.status)
+    if resp.status >= 400:
+        raise APIRejected(f"API {resp.status}: {_snippet(raw, 300)}", action=action, status=resp.status)
+    try:
+        body = json_loads(raw)
+    except Exception:
+        raise APIBadResponse(f"API returned non-JSON: {_snippet(raw, 200)}", action=action, status=resp.status)
+    if isinstance(body, dict) and "ok" in body and "data" in body:
+        if not body.get("ok", False):
+            err = body.get("error") or body.get("data")
+            if isinstance(err, str) and "upstream_timeout" in err.lower():
+                raise APITimeout(f"API error: {err}", action=action, status=resp.status)
+            raise APIRejected(f"API error: {err}", action=action, status=resp.status)
+        return _expand_result_json(body.get("data", {}))
+    return _expand_result_json(body)
+
+def _snippet(raw: bytes, n: int) -> str:
+    return raw[:n].decode("utf-8", "replace")
+
+def _expand_result_json(data):
+    """Decode a draw row's nested `result_json` string once, here, into `results`,
+       so cached copies and every reader share the parsed list."""
+    for row in (data, data.get("data") if isinstance(data, dict) else None):
+        if isinstance(row, dict) and isinstance(row.get("result_json"), str):
+            try:
+                parsed = json_loads(row["result_json"])
+            except Exception:
+                continue
+            if isinstance(parsed, list):
+                row["results"] = parsed
+                del row["result_json"]
+    return data
 
 # --- Sync + lifecycle ---
-@bot.event
-async def on_ready():
+# Startup is staged: setup_hook runs right after login, before the gateway
+# connects, and starts the HTTP warm-up, dex load, metrics endpoint and command
+# sync in the background so they overlap the gateway handshake. on_ready (which
+# also fires after every reconnect) only does what needs the gateway cache.
+COMMAND_SYNC_PATH  = PROCESS_DIR / "command_sync.json"   # application:guild -> hash of the last synced tree
+FORCE_COMMAND_SYNC = os.getenv("FORCE_COMMAND_SYNC", "0") == "1"
+
+def _command_tree_hash() -> str:
+    """Stable digest of every command payload we would upload (global + GID scope)."""
+    scopes = {"global": bot.tree.get_commands()}
+    if GID:
+        scopes[str(GID)] = bot.tree.get_commands(guild=discord.Object(id=GID))
+    payload = {
+        scope: sorted((c.to_dict(bot.tree) for c in cmds), key=lambda d: (d.get("type", 1), d["name"]))
+        for scope, cmds in scopes.items()
+    }
+    # stdlib on purpose: the digest must not change with JSON_CODEC
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str).encode()).hexdigest()
+
+def _load_sync_state() -> dict:
+    try:
+        return json.loads(COMMAND_SYNC_PATH.read_text("utf-8"))
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        print("[sync] state unreadable, will resync:", e)
+        return {}
+
+def _save_sync_state(state: dict):
+    try:
+        COMMAND_SYNC_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp = COMMAND_SYNC_PATH.with_suffix(".tmp")
+        tmp.write_text(json.dumps(state, separators=(",", ":")), "utf-8")
+        tmp.replace(COMMAND_SYNC_PATH)
+    except Exception as e:
+        print("[sync] state save failed:", e)
+
+async def sync_commands(force: bool = False) -> list[str] | None:
+    """Upload the command tree only if it differs from the last one synced for this
+       application + guild. Returns the synced command names, or None when skipped."""
+    key = f"{bot.application_id}:{GID}"
+    digest = _command_tree_hash()
+    state = _load_sync_state()
+    if not (force or FORCE_COMMAND_SYNC) and state.get(key) == digest:
+        bot.commands_synced = True
+        metrics.inc("tlk_command_sync_total", (("result", "skipped"),))
+        print(f"✅ Command tree unchanged ({digest[:12]}); sync skipped")
+        return None
+    t0 = time.perf_counter()
     try:
+        names = []
         if GID:
             synced_g = await bot.tree.sync(guild=discord.Object(id=GID))
+            names += [c.name for c in synced_g]
             print("✅ Guild sync:", [c.name for c in synced_g], "to", GID)
         synced_glob = await bot.tree.sync()
+        names += [c.name for c in synced_glob]
         print("✅ Global sync (should be empty):", [c.name for c in synced_glob])
+    except Exception:
+        metrics.inc("tlk_command_sync_total", (("result", "error"),))
+        raise
+    state[key] = digest
+    _save_sync_state(state)
+    bot.commands_synced = True
+    metrics.inc("tlk_command_sync_total", (("result", "synced"),))
+    print(f"[sync] tree {digest[:12]} synced in {(time.perf_counter() - t0) * 1000:.0f} ms")
+    return names
+
+async def _sync_in_background():
+    try:
+        await sync_commands()
     except Exception as e:
         print("❌ Command sync error:", e)
-    print(f"Logged in as {bot.user} ({bot.user.id})")
+
+@bot.event
+async def setup_hook():
+    await _ensure_session()
+    _spawn(_warm_http_pool())
+    if bot.dex_task is None:
+        bot.dex_task = asyncio.create_task(_dex_refresh_loop())
+    if bot.metrics_runner is None:
+        try:
+            bot.metrics_runner = await start_metrics_server() or False
+        except Exception as e:
+            bot.metrics_runner = False
+            print("❌ Metrics server failed:", e)
+    await shared_state.start(_apply_remote_mutation)
+    if CLUSTER_ID == 0:   # the tree is the same for every cluster; one of them syncs it
+        bot.sync_task = _spawn(_sync_in_background())
+    else:
+        bot.commands_synced = True
+    print(f"[boot] logged in, background setup started {time.perf_counter() - BOOT_T0:.2f}s after start")
+
+@bot.event
+async def on_ready():
+    hype.start()
+    # Sync once per process; only retried here if the setup_hook attempt failed.
+    if not bot.commands_synced and (bot.sync_task is None or bot.sync_task.done()):
+        bot.sync_task = _spawn(_sync_in_background())
+    if bot.ready_s is None:
+        bot.ready_s = time.perf_counter() - BOOT_T0
+        metrics.gauge("tlk_boot_ready_seconds", (), bot.ready_s)
+        print(f"Logged in as {bot.user} ({bot.user.id}), ready {bot.ready_s:.2f}s after start")
+    else:
+        print(f"🔄 READY again as {bot.user} (reconnect); startup work not repeated")
+
+def _tap_shard_events(ws, shard_id: int):
+    """Count dispatch events on one gateway socket. discord.py doesn't say which shard an
+       event came from, so wrap the socket's dispatch hook (a new socket per connect)."""
+    inner = ws._dispatch
+    if getattr(inner, "shard_id", None) is not None:
+        return
+    shard = str(shard_id)
+    def dispatch(event, *args, **kwargs):
+        if event == "socket_event_type":
+            metrics.inc("tlk_shard_events_total", (("shard", shard), ("event", args[0])))
+        return inner(event, *args, **kwargs)
+    dispatch.shard_id = shard_id
+    ws._dispatch = dispatch
+
+@bot.event
+async def on_connect():
+    if not SHARDED:
+        metrics.inc("tlk_shard_connects_total", (("shard", "0"),))
+        _tap_shard_events(bot.ws, 0)
+
+@bot.event
+async def on_shard_connect(shard_id: int):
+    metrics.inc("tlk_shard_connects_total", (("shard", str(shard_id)),))
+    shard = bot.shards.get(shard_id)
+    if shard is not None:
+        _tap_shard_events(shard._parent.ws, shard_id)
+
+def _collect_shards():
+    pairs = bot.latencies if SHARDED else [(bot.shard_id or 0, bot.latency)]
+    for shard_id, lat in pairs:
+        yield "tlk_shard_latency_seconds", (("shard", str(shard_id)),), lat if lat == lat else 0.0  # NaN before connect
+
+metrics.collectors.append(_collect_shards)
 
 @bot.event
 async def on_disconnect():
@@ -117,6 +1191,245 @@ async def on_resumed():
 async def _graceful_close():
     if bot.http_session and not bot.http_session.closed:
         await bot.http_session.close()
+    await shared_state.close()
+    if bot.metrics_runner:
+        await bot.metrics_runner.cleanup()
+
+# --- Per-user guard for mutating commands ---
+USER_LOCK_WAIT_S = float(os.getenv("USER_LOCK_WAIT_S", "1.5"))  # must leave room in Discord's 3s ack window
+
+class UserBusy(Exception):
+    pass
+
+class UserLocks:
+    """One asyncio.Lock per user, created on demand and dropped as soon as nobody holds or waits on it."""
+
+    def __init__(self):
+        self._locks: dict[int, list] = {}  # user_id -> [lock, holders + waiters]
+
+    def __len__(self):
+        return len(self._locks)
+
+    @contextlib.asynccontextmanager
+    async def hold(self, user_id: int, timeout: float):
+        ent = self._locks.get(user_id)
+        if ent is None:
+            ent = self._locks[user_id] = [asyncio.Lock(), 0]
+        ent[1] += 1
+        try:
+            try:
+                await asyncio.wait_for(ent[0].acquire(), timeout)
+            except asyncio.TimeoutError:
+                raise UserBusy() from None
+            try:
+                yield
+            finally:
+                ent[0].release()
+        finally:
+            ent[1] -= 1
+            if ent[1] == 0 and self._locks.get(user_id) is ent:
+                del self._locks[user_id]
+
+user_locks = UserLocks()
+metrics.collectors.append(lambda: [("tlk_user_locks", (), len(user_locks))])
+
+# --- Shared state backend (per-user locks, rate-limit buckets, cross-cluster invalidation) ---
+# "memory" keeps everything in this process (single process / single cluster).
+# "redis" points every cluster at one Redis-compatible server so a user can't run
+# two mutations at once from different shards, rate-limit buckets are global, and a
+# mutation on one cluster drops the stale cached reads on the others. The caches
+# themselves stay in-process; only their invalidations travel.
+STATE_BACKEND     = os.getenv("STATE_BACKEND", "memory").lower()
+STATE_REDIS_URL   = os.getenv("STATE_REDIS_URL", "redis://127.0.0.1:6379/0")
+STATE_PREFIX      = os.getenv("STATE_PREFIX", "tlk:")
+STATE_LOCK_TTL_S  = float(os.getenv("STATE_LOCK_TTL_S", "120"))   # a crashed holder's lock expires after this
+WORKER_RPS        = float(os.getenv("WORKER_RPS", "0"))           # global Worker request rate cap; 0 = off
+WORKER_BURST      = float(os.getenv("WORKER_BURST", "20"))
+
+def _bucket_take(ent: list, rate: float, burst: float, now: float) -> float:
+    """Token bucket step on [tokens, ts]; returns 0 if a token was taken, else seconds to wait."""
+    ent[0] = min(burst, ent[0] + (now - ent[1]) * rate)
+    ent[1] = now
+    if ent[0] >= 1:
+        ent[0] -= 1
+        return 0.0
+    return (1 - ent[0]) / rate
+
+class MemoryState:
+    """Default backend: locks and buckets live in this process; nothing to broadcast."""
+    name = "memory"
+    shared = False
+
+    def __init__(self, locks: UserLocks):
+        self.locks = locks
+        self._buckets: dict[str, list] = {}   # key -> [tokens, ts]
+
+    async def start(self, on_remote):
+        pass
+
+    def hold(self, user_id: int, timeout: float):
+        return self.locks.hold(user_id, timeout)
+
+    async def take(self, key: str, rate: float, burst: float) -> float:
+        now = time.monotonic()
+        ent = self._buckets.setdefault(key, [burst, now])
+        return _bucket_take(ent, rate, burst, now)
+
+    async def publish(self, msg: dict):
+        pass
+
+    async def close(self):
+        pass
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:
+    aioredis = None
+
+class RedisState(MemoryState):
+    """Redis-backed locks/buckets plus a pub/sub channel for cache invalidations.
+       Falls back to the in-process behaviour (and counts it) when Redis is unreachable."""
+    name = "redis"
+    shared = True
+
+    _UNLOCK = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) end return 0"
+    _TAKE = """
+local t = redis.call('hmget', KEYS[1], 'tokens', 'ts')
+local rate, burst, now = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local tokens = math.min(burst, (tonumber(t[1]) or burst) + (now - (tonumber(t[2]) or now)) * rate)
+local wait = 0
+if tokens >= 1 then tokens = tokens - 1 else wait = (1 - tokens) / rate end
+redis.call('hset', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('pexpire', KEYS[1], math.ceil(burst / rate * 1000) + 1000)
+return tostring(wait)
+"""
+
+    def __init__(self, locks: UserLocks, url: str, prefix: str, lock_ttl: float):
+        super().__init__(locks)
+        if aioredis is None:
+            raise RuntimeError("STATE_BACKEND=redis needs the 'redis' package (pip install redis).")
+        self.r = aioredis.from_url(url)
+        self.prefix = prefix
+        self.lock_ttl_ms = int(lock_ttl * 1000)
+        self.channel = prefix + "invalidate"
+        self.origin = uuid.uuid4().hex
+        self.task: asyncio.Task | None = None
+
+    def _degraded(self, op: str, e: Exception):
+        metrics.inc("tlk_state_errors_total", (("op", op),))
+        print(f"[state] redis {op} failed, using local state:", e)
+
+    async def start(self, on_remote):
+        if self.task is None:
+            self.task = asyncio.create_task(self._listen(on_remote))
+
+    async def _listen(self, on_remote):
+        while True:
+            try:
+                async with self.r.pubsub() as ps:
+                    await ps.subscribe(self.channel)
+                    async for m in ps.listen():
+                        if m.get("type") != "message":
+                            continue
+                        msg = json_loads(m["data"])
+                        if msg.get("origin") != self.origin:
+                            metrics.inc("tlk_state_invalidations_total", (("direction", "in"),))
+                            on_remote(msg)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._degraded("subscribe", e)
+                await asyncio.sleep(5)
+
+    @contextlib.asynccontextmanager
+    async def hold(self, user_id: int, timeout: float):
+        deadline = time.monotonic() + timeout
+        # Same-process callers queue on the local lock, so only one of them polls Redis.
+        async with self.locks.hold(user_id, timeout):
+            key, token = f"{self.prefix}lock:{user_id}", uuid.uuid4().hex
+            try:
+                while not await self.r.set(key, token, nx=True, px=self.lock_ttl_ms):
+                    if time.monotonic() >= deadline:
+                        raise UserBusy()
+                    await asyncio.sleep(0.05)
+            except UserBusy:
+                raise
+            except Exception as e:
+                self._degraded("lock", e)
+                token = None
+            try:
+                yield
+            finally:
+                if token is not None:
+                    try:
+                        await self.r.eval(self._UNLOCK, 1, key, token)
+                    except Exception as e:
+                        self._degraded("unlock", e)
+
+    async def take(self, key: str, rate: float, burst: float) -> float:
+        try:
+            return float(await self.r.eval(self._TAKE, 1, f"{self.prefix}bucket:{key}", rate, burst, time.time()))
+        except Exception as e:
+            self._degraded("bucket", e)
+            return await super().take(key, rate, burst)
+
+    async def publish(self, msg: dict):
+        try:
+            await self.r.publish(self.channel, json_dumps({**msg, "origin": self.origin}))
+            metrics.inc("tlk_state_invalidations_total", (("direction", "out"),))
+        except Exception as e:
+            self._degraded("publish", e)
+
+    async def close(self):
+        if self.task is not None:
+            self.task.cancel()
+        await self.r.aclose()
+
+if STATE_BACKEND == "redis":
+    shared_state = RedisState(user_locks, STATE_REDIS_URL, STATE_PREFIX, STATE_LOCK_TTL_S)
+elif STATE_BACKEND == "memory":
+    shared_state = MemoryState(user_locks)
+else:
+    raise RuntimeError(f"Unknown STATE_BACKEND={STATE_BACKEND!r} (memory or redis).")
+print(f"STATE_BACKEND = {shared_state.name}")
+
+def _apply_remote_mutation(msg: dict):
+    """Another cluster ran a mutation: drop what it may have made stale here."""
+    payload = {"user_id": msg.get("user_id") or ""}
+    action = str(msg.get("action") or "")
+    _invalidate_after(action, payload)
+    _observe_mutation(action, payload, None)   # no response here -> forget the touched balances
+
+async def _worker_rate_gate(action: str):
+    while (wait := await shared_state.take("worker", WORKER_RPS, WORKER_BURST)) > 0:
+        metrics.inc("tlk_rate_limited_total", (("bucket", "worker"),))
+        await asyncio.sleep(wait)
+
+def per_user_serialized(when=None):
+    """Run a mutating command at most once at a time per user.
+
+    A second invocation waits up to USER_LOCK_WAIT_S, then gets an ephemeral
+    "already processing" reply. `when(kwargs)` can limit the guard to mutating
+    variants of a command (e.g. /shop buy but not /shop list).
+    """
+    def deco(func):
+        @functools.wraps(func)
+        async def wrapper(interaction: discord.Interaction, *args, **kwargs):
+            if when is not None and not when(kwargs):
+                return await func(interaction, *args, **kwargs)
+            try:
+                async with shared_state.hold(interaction.user.id, USER_LOCK_WAIT_S):
+                    return await func(interaction, *args, **kwargs)
+            except UserBusy:
+                cmd = interaction.command.name if interaction.command else func.__name__
+                metrics.inc("tlk_user_busy_total", (("command", cmd),))
+                msg = "⏳ Already processing your previous command — give it a moment."
+                try:
+                    await interaction.response.send_message(msg, ephemeral=True)
+                except discord.InteractionResponded:
+                    await interaction.followup.send(msg, ephemeral=True)
+        return wrapper
+    return deco
 
 # --- Autocomplete ---
 async def _pack_autocomplete(_itx: discord.Interaction, current: str):
@@ -124,181 +1437,751 @@ async def _pack_autocomplete(_itx: discord.Interaction, current: str):
     out = [name for name in PACK_NAMES if q in name.lower()]
     return [app_commands.Choice(name=n, value=n) for n in out[:25]]
 
-# --- Reveal UI ---
-class RevealState(discord.ui.View):
-    def __init__(self, pulls_sorted: list[dict], owner_id: int, pack_name: str, god: bool, best: dict | None):
-        super().__init__(timeout=600)
-        self.pulls_sorted = list(pulls_sorted)
-        self.queue = list(pulls_sorted)
-        self.owner_id = owner_id
-        self.pack_name = pack_name
-        self.god = god
-        self.best = best or (pulls_sorted[-1] if pulls_sorted else None)
-        self.total = len(pulls_sorted)
-        self.revealed = 0
-        self.done = False
-
-    async def _post_summary(self, itx: discord.Interaction):
-        rarity_em = {"N":"⚪","R":"🟦","AR":"🟪","SR":"🟧","SSR":"🟨"}
-        lines = []
-        for r in self.pulls_sorted:
-            em = rarity_em.get(r.get("rarity",""), "📦")
-            nm = r.get("name","(unknown)")
-            rn = r.get("rarity","")
-            sn = r.get("serial_no")
-            lines.append(f"{em} **{nm}** [{rn}] " + (f"#**{sn}**" if sn else ""))
-        desc = "\n".join(lines) if lines else "Pack complete!"
-        emb = discord.Embed(
-            title=f"{self.pack_name} — Results",
-            description=desc,
-            color=0xFFD166 if self.god else 0x57F287,
-        )
-        await itx.followup.send(embed=emb)
-
+# --- Card art cache (disk LRU keyed by URL, ETag-revalidated) ---
+ART_CACHE_MAX_MB      = float(os.getenv("ART_CACHE_MAX_MB", "256"))
+ART_FETCH_CONCURRENCY = int(os.getenv("ART_FETCH_CONCURRENCY", "8"))
+ART_REVALIDATE_S      = float(os.getenv("ART_REVALIDATE_S", str(24 * 3600)))
+ART_MAX_IMAGE_BYTES   = 8 * 1024 * 1024
+ART_TIMEOUT           = aiohttp.ClientTimeout(total=10, connect=3, sock_read=5)
+
+class ArtCache:
+    """Downloaded card images on disk, newest-used last. Entries older than
+       `revalidate_s` are re-checked with If-None-Match; a 304 just refreshes them."""
+
+    def __init__(self, root: Path, max_bytes: int, concurrency: int, revalidate_s: float):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.revalidate_s = revalidate_s
+        self._sem = asyncio.Semaphore(max(1, concurrency))
+        self._index: OrderedDict[str, list] = OrderedDict()   # key -> [size, etag, fetched_ts]
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._loaded = False
+        self.bytes = 0
+
+    @staticmethod
+    def key(url: str) -> str:
+        return hashlib.sha1(url.encode()).hexdigest()
+
+    def _load(self):
+        """Rebuild the index from disk once, oldest file first."""
+        self._loaded = True
+        self.root.mkdir(parents=True, exist_ok=True)
+        entries = []
+        for f in self.root.glob("*.img"):
+            st = f.stat()
+            etag_f = f.with_suffix(".etag")
+            etag = etag_f.read_text() if etag_f.exists() else None
+            entries.append((st.st_mtime, f.stem, st.st_size, etag))
+        for mtime, key, size, etag in sorted(entries):
+            self._index[key] = [size, etag, mtime]
+            self.bytes += size
+
+    def _read(self, key: str) -> bytes | None:
         try:
-            if HYPE_CHANNEL_ID and (self.god or any(x.get("rarity") in ("SR","SSR") for x in self.pulls_sorted)):
-                # 1) get from cache, else fetch
-                chan = bot.get_channel(HYPE_CHANNEL_ID)
-                if chan is None:
-                    try:
-                        chan = await bot.fetch_channel(HYPE_CHANNEL_ID)
-                    except Exception as e:
-                        print("[hype] fetch_channel failed:", e)
-                        chan = None
-
-                # 2) if it’s a Forum parent, post to the current thread instead
-                if isinstance(chan, discord.ForumChannel):
-                    chan = itx.channel
-
-                if chan:
-                    user = itx.user.mention
-                    big = [x for x in self.pulls_sorted if x.get("rarity") in ("SR", "SSR")]
-                    if self.god:
-                        await chan.send(f"🎉 {user} just opened a **GOD PACK** in **{self.pack_name}**!")
-                    elif big:
-                        top = big[-1]
-                        msg = f"🎊 {user} just pulled a **{top.get('rarity')} {top.get('name')}**!"
-                        img = (top.get("image_ref") or "").strip()
-                        if img:
-                            emb = discord.Embed(
-                                color=0xFFD166 if top.get("rarity") == "SSR" else 0xFFA654,
-                                description=msg
-                            )
-                            emb.set_image(url=img)
-                            await chan.send(embed=emb)
-                        else:
-                            await chan.send(msg)
+            return (self.root / f"{key}.img").read_bytes()
+        except OSError:
+            return None
+
+    def _write(self, key: str, data: bytes, etag: str | None, victims: list[str]):
+        tmp = self.root / f"{key}.tmp"
+        tmp.write_bytes(data)
+        os.replace(tmp, self.root / f"{key}.img")
+        etag_f = self.root / f"{key}.etag"
+        if etag:
+            etag_f.write_text(etag)
+        else:
+            etag_f.unlink(missing_ok=True)
+        for v in victims:
+            (self.root / f"{v}.img").unlink(missing_ok=True)
+            (self.root / f"{v}.etag").unlink(missing_ok=True)
+
+    def _admit(self, key: str, size: int, etag: str | None) -> list[str]:
+        old = self._index.pop(key, None)
+        if old:
+            self.bytes -= old[0]
+        self._index[key] = [size, etag, time.time()]
+        self.bytes += size
+        victims = []
+        while self.bytes > self.max_bytes and len(self._index) > 1:
+            vkey, (vsize, _etag, _ts) = self._index.popitem(last=False)
+            self.bytes -= vsize
+            victims.append(vkey)
+        return victims
+
+    def cached(self, url: str | None) -> bool:
+        return bool(url) and self.key(url) in self._index
+
+    async def get(self, url: str | None) -> bytes | None:
+        """Image bytes for `url`, downloading at most once no matter how many callers ask."""
+        if not url:
+            return None
+        if not self._loaded:
+            await asyncio.to_thread(self._load)
+        key = self.key(url)
+        fut = self._inflight.get(key)
+        if fut is None:
+            fut = self._inflight[key] = asyncio.ensure_future(self._get(url, key))
+            fut.add_done_callback(lambda _f: self._inflight.pop(key, None))
+        return await asyncio.shield(fut)
+
+    async def warm(self, urls) -> int:
+        """Fetch every missing URL concurrently (bounded by the pool); returns how many are now on disk."""
+        got = await asyncio.gather(*(self.get(u) for u in set(filter(None, urls))), return_exceptions=True)
+        return sum(1 for g in got if isinstance(g, bytes))
+
+    async def _get(self, url: str, key: str) -> bytes | None:
+        ent = self._index.get(key)
+        if ent and time.time() - ent[2] < self.revalidate_s:
+            self._index.move_to_end(key)
+            data = await asyncio.to_thread(self._read, key)
+            if data is not None:
+                metrics.inc("tlk_art_requests_total", (("result", "hit"),))
+                return data
+            ent = None
+        await _ensure_session()
+        headers = {"If-None-Match": ent[1]} if ent and ent[1] else {}
+        try:
+            async with self._sem:
+                async with bot.http_session.get(url, headers=headers, timeout=ART_TIMEOUT) as resp:
+                    if resp.status == 304 and ent:
+                        ent[2] = time.time()
+                        self._index.move_to_end(key)
+                        metrics.inc("tlk_art_requests_total", (("result", "revalidated"),))
+                        return await asyncio.to_thread(self._read, key)
+                    if resp.status != 200 or (resp.content_length or 0) > ART_MAX_IMAGE_BYTES:
+                        raise aiohttp.ClientResponseError(resp.request_info, (), status=resp.status)
+                    data = await resp.read()
+                    etag = resp.headers.get("ETag")
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            metrics.inc("tlk_art_requests_total", (("result", "error"),))
+            print(f"[art] fetch failed for {url}: {e}")
+            # A stale copy beats a blank tile.
+            return await asyncio.to_thread(self._read, key) if ent else None
+        victims = self._admit(key, len(data), etag)
+        await asyncio.to_thread(self._write, key, data, etag, victims)
+        metrics.inc("tlk_art_requests_total", (("result", "miss"),))
+        return data
+
+art_cache = ArtCache(PROCESS_DIR / "art", int(ART_CACHE_MAX_MB * 1024 * 1024), ART_FETCH_CONCURRENCY, ART_REVALIDATE_S)
+metrics.collectors.append(lambda: [
+    ("tlk_art_cache_bytes", (), art_cache.bytes),
+    ("tlk_art_cache_entries", (), len(art_cache._index)),
+    ("tlk_art_hosted_urls", (), len(art_host.file.data)),
+])
+
+# --- Card art re-hosting (image_ref -> Discord CDN URL) ---
+ART_CHANNEL_ID     = int(os.getenv("ART_CHANNEL_ID", "0"))         # private channel art is re-hosted in; 0 = use origin URLs
+# Re-host a pack's art when its reveal starts. Without ART_CHANNEL_ID the embeds keep the
+# origin URLs, so downloading the art would only add image-host traffic and disk churn.
+ART_PREFETCH       = bool(ART_CHANNEL_ID) and os.getenv("ART_PREFETCH", "1") != "0"
+ART_URL_TTL_S      = float(os.getenv("ART_URL_TTL_S", str(20 * 3600)))  # for CDN URLs without an ex= expiry
+ART_PREPARE_WAIT_S = float(os.getenv("ART_PREPARE_WAIT_S", "1.0"))  # instant reveals wait this long for re-hosting
+ART_UPLOAD_BATCH   = 10                                             # attachments per message
+
+def _image_ext(blob: bytes) -> str:
+    if blob.startswith(b"\x89PNG"):
+        return ".png"
+    if blob.startswith(b"GIF8"):
+        return ".gif"
+    if blob[:4] == b"RIFF" and blob[8:12] == b"WEBP":
+        return ".webp"
+    return ".jpg"
+
+def _cdn_expiry(url: str) -> float:
+    """Discord signs attachment URLs with a hex `ex=` timestamp; renew an hour before it."""
+    m = re.search(r"[?&]ex=([0-9a-fA-F]+)", url)
+    return int(m.group(1), 16) - 3600 if m else time.time() + ART_URL_TTL_S
+
+class ArtHost:
+    """Uploads card art to ART_CHANNEL_ID once (ten images per message) and remembers
+       the CDN URL, so embeds stop sending Discord to slow origins. Unknown or expired
+       images fall back to their origin URL."""
+
+    def __init__(self, channel_id: int, path: Path):
+        self.channel_id = channel_id
+        self._channel = None
+        self._inflight: dict[str, asyncio.Future] = {}
+        self.file = SharedJsonFile(path, "art")   # image_ref -> [cdn url, expires]; every cluster reuses uploads
+        self.uploads = 0
+
+    def url_for(self, image_ref: str | None) -> str | None:
+        ent = self.file.fresh().get(image_ref) if image_ref else None
+        return ent[0] if ent and ent[1] > time.time() else image_ref
+
+    async def prepare(self, urls):
+        """Warm the disk cache for `urls` and, with a channel configured, re-host anything not yet hosted."""
+        urls = list(dict.fromkeys(u for u in urls if u))
+        if not urls:
+            return
+        if not self.channel_id:
+            await art_cache.warm(urls)
+            return
+        now = time.time()
+        waits = {self._inflight[u] for u in urls if u in self._inflight}
+        hosted = self.file.fresh()
+        todo = [u for u in urls if u not in self._inflight and not (u in hosted and hosted[u][1] > now)]
+        if todo:
+            fut = asyncio.ensure_future(self._upload(todo))
+            for u in todo:
+                self._inflight[u] = fut
+            fut.add_done_callback(lambda _f: [self._inflight.pop(u, None) for u in todo])
+            waits.add(fut)
+        for res in await asyncio.gather(*waits, return_exceptions=True):
+            if isinstance(res, Exception):
+                print("[art] re-host failed:", res)
+
+    async def _resolve(self):
+        if self._channel is None:
+            self._channel = bot.get_channel(self.channel_id) or await bot.fetch_channel(self.channel_id)
+        return self._channel
+
+    async def _upload(self, urls: list[str]):
+        blobs = await asyncio.gather(*(art_cache.get(u) for u in urls))
+        pending = [(u, b) for u, b in zip(urls, blobs) if b]
+        if not pending:
+            return
+        chan = await self._resolve()
+        new = {}
+        for i in range(0, len(pending), ART_UPLOAD_BATCH):
+            batch = pending[i:i + ART_UPLOAD_BATCH]
+            names = {f"{art_cache.key(u)}{_image_ext(b)}": u for u, b in batch}
+            msg = await chan.send(files=[discord.File(io.BytesIO(b), filename=n) for n, (u, b) in zip(names, batch)])
+            for att in msg.attachments:
+                u = names.get(att.filename)
+                if u:
+                    new[u] = self.file.data[u] = [att.url, _cdn_expiry(att.url)]
+            self.uploads += len(batch)
+        self._save(new)
+
+    def _save(self, new: dict):
+        def merge(d: dict):
+            d.update(new)
+            now = time.time()
+            for u in [u for u, ent in d.items() if ent[1] <= now]:
+                del d[u]
+        try:
+            self.file.update(merge)
         except Exception as e:
-            print("[hype] send failed:", e)
+            print("[art] url map save failed:", e)
 
+art_host = ArtHost(ART_CHANNEL_ID, DATA_DIR / "art_urls.json")
 
-        async def _maybe_hype(self, itx: discord.Interaction, card: dict):
-            """Post a hype message to HYPE_CHANNEL_ID for SR/SSR or God Pack (once)."""
-            # Channel configured?
-            if not HYPE_CHANNEL_ID:
-                return
-            chan = bot.get_channel(HYPE_CHANNEL_ID)
-            if not chan:
-                return
+# --- Card formatting (rarity tables + card-line templates shared by every command) ---
+RARITY_EMOJI = {"N":"⚪","R":"🟦","AR":"🟪","SR":"🟧","SSR":"🟨"}
+RARITY_COLOR = {"SR": 0xFFA654, "SSR": 0xFFD166}   # single-card embeds; others use CARD_COLOR
+CARD_COLOR   = 0x5865F2
+NO_EMOJI     = "📦"
+_rank = RARITY_ORDER.get
 
-            # God Pack? (announce once per session)
-            try:
-                if self.god and not getattr(self, "_hyped_god", False):
-                    self._hyped_god = True
-                    await chan.send(
-                        f"💥 {itx.user.mention} just opened a **GOD PACK** in **{self.pack_name}**!!!"
-                    )
-                    # don't return; still allow individual SR/SSR hype too if you want
-            except Exception:
-                pass
+def rarity_rank(card) -> int:
+    """Sort key, worst to best; unknown rarities sort first."""
+    try:
+        r = card.rarity
+    except AttributeError:
+        r = card.get("rarity")
+    return _rank(r or "", -1)
+
+def _fields(card) -> tuple:
+    """(name, rarity, serial) from a Card without going through Card.get."""
+    if type(card) is Card:
+        return card.name, card.rarity, card.serial_no
+    g = card.get
+    return g("name"), g("rarity"), g("serial_no")
+
+def card_title(card) -> str:
+    """🟧 Name [SR]  •  #12"""
+    name, rarity, serial = _fields(card)
+    head = f"{RARITY_EMOJI.get(rarity, NO_EMOJI)} {name or '(unknown)'} [{rarity or ''}]"
+    return f"{head}  •  #{serial}" if serial else head
+
+def summary_line(card) -> str:
+    """🟧 **Name** [SR] #**12**"""
+    name, rarity, serial = _fields(card)
+    head = f"{RARITY_EMOJI.get(rarity, NO_EMOJI)} **{name or '(unknown)'}** [{rarity or ''}] "
+    return f"{head}#**{serial}**" if serial else head
+
+def highlight_line(card) -> str:
+    """🟧 **Name** [SR] #12"""
+    name, rarity, serial = _fields(card)
+    head = f"{RARITY_EMOJI.get(rarity, NO_EMOJI)} **{name}** [{rarity}]"
+    return f"{head} #{serial}" if serial else head
+
+def hype_line(mention: str, card) -> str:
+    name, rarity, _ = _fields(card)
+    return f"{RARITY_EMOJI.get(rarity, NO_EMOJI)} {mention} pulled **{rarity} {name}**"
+
+def hype_announcement(mention: str, card) -> tuple[str, int]:
+    """(🎊 @user just pulled a **SR Name**!, embed colour) for a single hype post."""
+    name, rarity, _ = _fields(card)
+    return f"🎊 {mention} just pulled a **{rarity} {name}**!", RARITY_COLOR.get(rarity, RARITY_COLOR["SR"])
+
+def rarity_tally(cards) -> str:
+    """🟨 SSR×1 • 🟧 SR×3 … best first."""
+    tally: dict[str, int] = {}
+    for c in cards:
+        r = _fields(c)[1] or "?"
+        tally[r] = tally.get(r, 0) + 1
+    return " • ".join(f"{RARITY_EMOJI.get(r, NO_EMOJI)} {r}×{n}" for r, n in sorted(tally.items(), key=lambda kv: -_rank(kv[0], -1)))
+
+def detail_lines(items) -> list[str]:
+    """/last_pack: 1. **Name** · SR • Club • FW #12"""
+    out = []
+    for i, it in enumerate(items, 1):
+        name = it.get("name") or it.get("player") or it.get("printcode") or it.get("card_id") or "Unknown"
+        bits = " • ".join([b for b in ((it.get("rarity") or "").strip(), it.get("club") or it.get("Club") or "",
+                                       it.get("position") or "") if b])
+        sn = it.get("serial") or it.get("serial_no")
+        out.append(f"{i}. **{name}** · {bits} #{sn}" if sn not in (None, "", 0) else f"{i}. **{name}** · {bits}")
+    return out
+
+def yield_lines(items, fallback: str = "Unknown") -> list[str]:
+    """/craft and /shop results: 1. **Name** [SR] #12"""
+    out = []
+    for i, it in enumerate(items, 1):
+        name = (it.get("name") or it.get("player") or it.get("printcode") or it.get("title")
+                or it.get("card_id") or fallback)
+        rr = (it.get("rarity") or "").strip()
+        head = f"{i}. **{name}** [{rr}]" if rr else f"{i}. **{name}** "
+        sn = it.get("serial") or it.get("serial_no")
+        out.append(f"{head} #{sn}" if sn not in (None, "", 0) else head)
+    return out
+
+def collection_labels(items, start: int = 1) -> list[str]:
+    """/collection field names: 1. Name [SR] #12"""
+    out = []
+    for i, it in enumerate(items, start):
+        sn = it.get("serial_no")
+        head = f"{i}. {it.get('name', '(unknown)')} [{it.get('rarity', '')}] "
+        out.append(f"{head}#{sn}" if sn else head)
+    return out
 
-            # Card-based hype (SR or above)
-            rarity = (card.get("rarity") or "").upper()
-            if rarity not in ("SR", "SSR"):
-                return
+# --- Reveal UI ---
+
+def _card_embed(card: dict, idx: int, total: int) -> discord.Embed:
+    img = art_host.url_for(card.get("image_ref"))
+    emb = discord.Embed(
+        title=card_title(card),
+        description=f"Card {idx}/{total}",
+        color=RARITY_COLOR.get(_fields(card)[1], CARD_COLOR),
+    )
+    if img:
+        emb.set_image(url=img)
+    return emb
+
+def _summary_embed(pulls_sorted: list[dict], pack_name: str, god: bool) -> discord.Embed:
+    desc = "\n".join(map(summary_line, pulls_sorted)) or "Pack complete!"
+    return discord.Embed(
+        title=f"{pack_name} — Results",
+        description=desc,
+        color=0xFFD166 if god else 0x57F287,
+    )
 
-            name = card.get("name") or "Unknown"
+# --- Hype dispatcher ---
+HYPE_WINDOW_S     = float(os.getenv("HYPE_WINDOW_S", "10"))   # min gap between hype posts; bursts inside it become one digest
+HYPE_QUEUE_MAX    = int(os.getenv("HYPE_QUEUE_MAX", "500"))
+HYPE_THREAD_NAME  = os.getenv("HYPE_THREAD_NAME", "Big Pulls")  # used when HYPE_CHANNEL_ID is a Forum
+HYPE_DIGEST_LINES = 25
+
+class HypeDispatcher:
+    """Background poster for SR/SSR/God-pack announcements.
+
+    Reveals only `submit()` (never awaits Discord). The first announcement after a
+    quiet period goes out immediately; anything arriving within HYPE_WINDOW_S of
+    the last post is held and sent as a single digest. The channel is resolved
+    once and cached; a Forum parent resolves to a dedicated thread.
+    """
+
+    def __init__(self, channel_id: int, window: float, maxsize: int):
+        self.channel_id = channel_id
+        self.window = window
+        self.queue: asyncio.Queue[dict] = asyncio.Queue(maxsize)
+        self.task: asyncio.Task | None = None
+        self._channel = None
+        self._last_send = float("-inf")
+        self.sent = self.digests = self.dropped = 0
+
+    def start(self):
+        if self.channel_id and self.task is None:
+            self.task = asyncio.create_task(self._run())
+
+    def submit(self, item: dict) -> bool:
+        if self.task is None:
+            return False
+        try:
+            self.queue.put_nowait(item)
+            return True
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return False
+
+    async def _resolve(self):
+        if self._channel is not None:
+            return self._channel
+        chan = bot.get_channel(self.channel_id)
+        if chan is None:
+            chan = await bot.fetch_channel(self.channel_id)
+        if isinstance(chan, discord.ForumChannel):
+            chan = await self._forum_thread(chan)
+        self._channel = chan
+        return chan
+
+    async def _forum_thread(self, forum: discord.ForumChannel) -> discord.Thread:
+        """Reuse the hype thread, reopening it if it auto-archived; create it only if it never existed."""
+        thread = next((t for t in forum.threads if t.name == HYPE_THREAD_NAME), None)
+        if thread is None:
+            # Archived threads aren't in the gateway cache; without this every restart after
+            # the thread went idle would start a duplicate.
+            async for t in forum.archived_threads(limit=100):
+                if t.name == HYPE_THREAD_NAME:
+                    thread = t
+                    break
+        if thread is None:
+            return (await forum.create_thread(name=HYPE_THREAD_NAME, content="🎊 Big pulls land here.")).thread
+        if thread.archived and not thread.locked:
+            thread = await thread.edit(archived=False)
+        return thread
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = self._last_send + self.window
+            while (remaining := deadline - loop.time()) > 0:
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            while not self.queue.empty():
+                batch.append(self.queue.get_nowait())
             try:
-                msg = f"{itx.user.mention} just pulled out a **{rarity} {name}**!!! Congrats!"
-                img = card.get("image_ref")
+                await self._send(batch)
+            except (discord.NotFound, discord.Forbidden) as e:
+                print("[hype] channel unusable, will re-resolve:", e)
+                self._channel = None
+            except Exception as e:
+                print("[hype] send failed:", e)
+            self._last_send = loop.time()
+
+    async def _send(self, batch: list[dict]):
+        chan = await self._resolve()
+        if len(batch) == 1:
+            it = batch[0]
+            top = it["top"]
+            if it["god"]:
+                await chan.send(f"🎉 {it['mention']} just opened a **GOD PACK** in **{it['pack_name']}**!")
+            elif top:
+                msg, color = hype_announcement(it["mention"], top)
+                img = art_host.url_for((top.get("image_ref") or "").strip())
                 if img:
-                    emb = discord.Embed(color=0xFFD166 if rarity == "SSR" else 0xFFA654)
+                    emb = discord.Embed(color=color, description=msg)
                     emb.set_image(url=img)
-                    await chan.send(msg, embed=emb)
+                    await chan.send(embed=emb)
                 else:
                     await chan.send(msg)
-            except Exception:
-                # Never let hype failures break the reveal flow.
-                pass
+            self.sent += 1
+            return
+        batch.sort(key=lambda it: (not it["god"], -RARITY_ORDER.get((it["top"] or {}).get("rarity") or "", -1)))
+        lines = []
+        for it in batch[:HYPE_DIGEST_LINES]:
+            top = it["top"]
+            if it["god"]:
+                lines.append(f"🎉 {it['mention']} opened a **GOD PACK** in **{it['pack_name']}**")
+            else:
+                lines.append(hype_line(it["mention"], top))
+        if len(batch) > HYPE_DIGEST_LINES:
+            lines.append(f"…and **{len(batch) - HYPE_DIGEST_LINES}** more!")
+        ssr = any((it["top"] or {}).get("rarity") == "SSR" or it["god"] for it in batch)
+        await chan.send(embed=discord.Embed(
+            title=f"🔥 {len(batch)} big pulls just landed!",
+            description="\n".join(lines),
+            color=RARITY_COLOR["SSR" if ssr else "SR"],
+        ))
+        self.sent += 1
+        self.digests += 1
+
+hype = HypeDispatcher(HYPE_CHANNEL_ID, HYPE_WINDOW_S, HYPE_QUEUE_MAX)
+metrics.collectors.append(lambda: [
+    ("tlk_hype_queue_depth", (), hype.queue.qsize()),
+    ("tlk_hype_sent", (), hype.sent),
+    ("tlk_hype_digests", (), hype.digests),
+    ("tlk_hype_dropped", (), hype.dropped),
+])
+
+def _announce_hype(user, pulls_sorted: list[dict], pack_name: str, god: bool):
+    """Queue a hype post for a God pack or the best SR/SSR pull; returns immediately."""
+    big = [x for x in pulls_sorted if x.get("rarity") in ("SR", "SSR")]
+    if god or big:
+        hype.submit({"mention": user.mention, "pack_name": pack_name, "god": god, "top": big[-1] if big else None})
+
+# --- Reveal sessions (persistent: SQLite store + custom_id-routed buttons) ---
+REVEAL_SESSION_TTL_S = float(os.getenv("REVEAL_SESSION_TTL_S", str(7 * 24 * 3600)))
+REVEAL_MEMORY_MAX    = int(os.getenv("REVEAL_MEMORY_MAX", "2000"))   # hot sessions kept in RAM
+
+class RevealState:
+    """One pack being flipped card by card. `revealed` is the cursor into the shared `pulls_sorted` tuple."""
+    __slots__ = ("sid", "owner_id", "pack_name", "god", "pulls_sorted", "revealed", "done")
+
+    def __init__(self, sid: str, owner_id: int, pack_name: str, god: bool, pulls_sorted: tuple,
+                 revealed: int = 0, done: bool = False):
+        self.sid = sid
+        self.owner_id = owner_id
+        self.pack_name = pack_name
+        self.god = god
+        self.pulls_sorted = pulls_sorted
+        self.revealed = revealed
+        self.done = done
+
+    @property
+    def total(self) -> int:
+        return len(self.pulls_sorted)
+
+class RevealStore:
+    """Write-through session store: an LRU of live sessions in front of a small SQLite table.
+
+    Every state change is one tiny UPDATE, so a restart loses nothing and old
+    buttons pick up exactly where they were.
+    """
+
+    def __init__(self, path: Path, ttl: float, memory_max: int):
+        self.path = path
+        self.ttl = ttl
+        self.memory_max = memory_max
+        self._mem: OrderedDict[str, RevealState] = OrderedDict()
+        self._db: sqlite3.Connection | None = None
+
+    def _conn(self) -> sqlite3.Connection:
+        if self._db is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(self.path, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS reveal_sessions ("
+                " sid TEXT PRIMARY KEY, owner_id INTEGER, pack_name TEXT, god INTEGER,"
+                " cards TEXT, revealed INTEGER, done INTEGER, updated_ts REAL)"
+            )
+            db.execute("DELETE FROM reveal_sessions WHERE updated_ts < ?", (time.time() - self.ttl,))
+            self._db = db
+        return self._db
+
+    def _remember(self, st: RevealState):
+        self._mem[st.sid] = st
+        self._mem.move_to_end(st.sid)
+        while len(self._mem) > self.memory_max:
+            self._mem.popitem(last=False)
+
+    def __len__(self):
+        return len(self._mem)
+
+    def footprint(self) -> int:
+        """Approximate bytes held by live sessions (records, cursor state, card strings)."""
+        n = 0
+        for st in self._mem.values():
+            n += sys.getsizeof(st) + sys.getsizeof(st.pulls_sorted)
+            for c in st.pulls_sorted:
+                n += sys.getsizeof(c) + sum(sys.getsizeof(v) for v in (c.card_id, c.name, c.image_ref) if v)
+        return n
+
+    def create(self, owner_id: int, pack_name: str, god: bool, pulls_sorted: tuple) -> RevealState:
+        st = RevealState(uuid.uuid4().hex, owner_id, pack_name, god, pulls_sorted)
+        cards = json_dumps([c.row() for c in pulls_sorted])
+        self._conn().execute(
+            "INSERT INTO reveal_sessions VALUES (?,?,?,?,?,?,?,?)",
+            (st.sid, owner_id, pack_name, int(god), cards, 0, 0, time.time()),
+        )
+        self._remember(st)
+        return st
+
+    def get(self, sid: str) -> RevealState | None:
+        st = self._mem.get(sid)
+        if st is not None:
+            self._mem.move_to_end(sid)
+            return st
+        row = self._conn().execute(
+            "SELECT owner_id, pack_name, god, cards, revealed, done FROM reveal_sessions WHERE sid = ?", (sid,)
+        ).fetchone()
+        if row is None:
+            return None
+        cards = tuple(_normalize_card(c) if isinstance(c, dict) else Card(*c) for c in json_loads(row[3]))
+        st = RevealState(sid, row[0], row[1], bool(row[2]), cards, row[4], bool(row[5]))
+        if not st.done:
+            self._remember(st)
+        return st
+
+    def save(self, st: RevealState):
+        self._conn().execute(
+            "UPDATE reveal_sessions SET revealed = ?, done = ?, updated_ts = ? WHERE sid = ?",
+            (st.revealed, int(st.done), time.time(), st.sid),
+        )
+        if st.done:
+            self._mem.pop(st.sid, None)
+
+reveal_store = RevealStore(PROCESS_DIR / "reveal_sessions.sqlite3", REVEAL_SESSION_TTL_S, REVEAL_MEMORY_MAX)
+metrics.collectors.append(lambda: [
+    ("tlk_reveal_sessions_live", (), len(reveal_store)),
+    ("tlk_reveal_sessions_bytes", (), reveal_store.footprint()),
+])
+
+class RevealNextButton(discord.ui.DynamicItem[discord.ui.Button], template=r"reveal:next:(?P<sid>[0-9a-f]{32})"):
+    def __init__(self, sid: str, disabled: bool = False):
+        super().__init__(discord.ui.Button(
+            label="Reveal Next", style=discord.ButtonStyle.primary, custom_id=f"reveal:next:{sid}", disabled=disabled))
+        self.sid = sid
+
+    @classmethod
+    async def from_custom_id(cls, _itx: discord.Interaction, _item: discord.ui.Button, match: re.Match[str]):
+        return cls(match["sid"])
+
+    async def callback(self, itx: discord.Interaction):
+        st = reveal_store.get(self.sid)
+        if st is None:
+            return await itx.response.send_message("This reveal has expired — try `/last_pack`.", ephemeral=True)
+        if itx.user.id != st.owner_id:
+            return await itx.response.send_message("Only the pack opener can use this.", ephemeral=True)
+        if st.done or st.revealed >= st.total:
+            return await itx.response.edit_message(view=None)
+        card = st.pulls_sorted[st.revealed]
+        st.revealed += 1
+        st.done = st.revealed >= st.total   # last card: disable the buttons in the same edit
+        reveal_store.save(st)
+        # One REST call per click: the interaction callback edits the message in place.
+        await itx.response.edit_message(embed=_card_embed(card, st.revealed, st.total), view=_reveal_view(st.sid, st.done))
+        if st.done:
+            await itx.followup.send(embed=_summary_embed(st.pulls_sorted, st.pack_name, st.god))
+            _announce_hype(itx.user, st.pulls_sorted, st.pack_name, st.god)
+
+class RevealCloseButton(discord.ui.DynamicItem[discord.ui.Button], template=r"reveal:close:(?P<sid>[0-9a-f]{32})"):
+    def __init__(self, sid: str, disabled: bool = False):
+        super().__init__(discord.ui.Button(
+            label="Close", style=discord.ButtonStyle.danger, custom_id=f"reveal:close:{sid}", disabled=disabled))
+        self.sid = sid
+
+    @classmethod
+    async def from_custom_id(cls, _itx: discord.Interaction, _item: discord.ui.Button, match: re.Match[str]):
+        return cls(match["sid"])
+
+    async def callback(self, itx: discord.Interaction):
+        st = reveal_store.get(self.sid)
+        if st is not None and itx.user.id != st.owner_id:
+            return await itx.response.send_message("Only the pack opener can close this.", ephemeral=True)
+        if st is not None:
+            st.done = True
+            reveal_store.save(st)
+        await itx.response.edit_message(view=_reveal_view(self.sid, True))
+        await itx.followup.send("Session closed.")
 
+bot.add_dynamic_items(RevealNextButton, RevealCloseButton)
 
+def _reveal_view(sid: str, disabled: bool = False) -> discord.ui.View:
+    """Render-only view: clicks are routed by custom_id to the dynamic items above,
+       so nothing is kept in discord.py's view store (stopped before sending)."""
+    view = discord.ui.View(timeout=None)
+    view.add_item(RevealNextButton(sid, disabled))
+    view.add_item(RevealCloseButton(sid, disabled))
+    view.stop()
+    return view
 
-    @discord.ui.button(label="Reveal Next", style=discord.ButtonStyle.primary)
-    async def reveal_next(self, itx: discord.Interaction, _button: discord.ui.Button):
-        if itx.user.id != self.owner_id:
-            return await itx.response.send_message("Only the pack opener can use this.", ephemeral=True)
-        await itx.response.defer(thinking=False)
-        if self.done or not self.queue:
-            try:
-                await itx.message.edit(view=None)
-            except Exception:
-                pass
-            return
-        card = self.queue.pop(0)
-        self.revealed += 1
-        try:
-            await itx.message.edit(view=None)
-        except Exception:
-            pass
-        rarity_em = {"N":"⚪","R":"🟦","AR":"🟪","SR":"🟧","SSR":"🟨"}
-        name   = card.get("name", "(unknown)")
-        rarity = card.get("rarity", "")
-        serial = card.get("serial_no")
-        img    = card.get("image_ref")
-        em     = rarity_em.get(rarity, "📦")
-        color = 0x5865F2
-        if rarity == "SR":  color = 0xFFA654
-        if rarity == "SSR": color = 0xFFD166
-        reveal_embed = discord.Embed(
-            title=f"{em} {name} [{rarity}]" + (f"  •  #{serial}" if serial else ""),
-            description=f"Card {self.revealed}/{self.total}",
-            color=color,
-        )
-        if img:
-            reveal_embed.set_image(url=img)
-        await itx.message.edit(embed=reveal_embed, view=self) 
-        if self.queue:
-            return
-        self.done = True
-        for child in self.children:
-            child.disabled = True
-        await itx.message.edit(view=self)
-        await self._post_summary(itx)
+# --- Reveal session helper ---
 
+class Card:
+    """Immutable-by-convention card record. `get()` mirrors dict.get so formatting code
+       can take either a Card or a raw API dict."""
+    __slots__ = ("card_id", "name", "rarity", "serial_no", "image_ref")
+
+    def __init__(self, card_id, name, rarity, serial_no, image_ref):
+        self.card_id = card_id
+        self.name = name
+        self.rarity = sys.intern(rarity) if isinstance(rarity, str) else rarity
+        self.serial_no = serial_no
+        self.image_ref = image_ref
+
+    def get(self, key: str, default=None):
+        v = getattr(self, key, None)
+        return default if v is None and key not in self.__slots__ else v
+
+    def row(self) -> tuple:
+        return (self.card_id, self.name, self.rarity, self.serial_no, self.image_ref)
+
+def _normalize_card(x) -> Card:
+    """Normalize to the record the reveal flow expects."""
+    if isinstance(x, Card):
+        return x
+    return Card(
+        x.get("card_id"),
+        x.get("name") or x.get("player") or x.get("printcode") or "Unknown",
+        x.get("rarity"),
+        x.get("serial_no") or x.get("serial"),
+        x.get("image_ref") or x.get("image_url"),
+    )
 
+# --- Reveal modes + per-user preference ---
+REVEAL_MODES = ("manual", "auto", "instant")
+REVEAL_CHOICES = [
+    app_commands.Choice(name="Manual — tap to flip each card", value="manual"),
+    app_commands.Choice(name="Auto — flips on a timer in one message", value="auto"),
+    app_commands.Choice(name="Instant — whole pack in one message", value="instant"),
+]
+AUTO_REVEAL_DELAY_S = float(os.getenv("AUTO_REVEAL_DELAY_S", "1.5"))
+MAX_EMBEDS = 10  # Discord per-message limit
 
-    @discord.ui.button(label="Close", style=discord.ButtonStyle.danger)
-    async def close(self, itx: discord.Interaction, _button: discord.ui.Button):
-        if itx.user.id != self.owner_id:
-            return await itx.response.send_message("Only the pack opener can close this.", ephemeral=True)
-        await itx.response.defer(thinking=False)
-        self.done = True
-        for child in self.children:
-            child.disabled = True
-        await itx.message.edit(view=self)
-        await itx.followup.send("Session closed.")
+class UserPrefs:
+    """Small JSON-file backed per-user settings (e.g. reveal mode), shared by all clusters."""
 
-# --- Reveal session helper ---
+    def __init__(self, path: Path):
+        self.file = SharedJsonFile(path, "prefs")
 
-def _normalize_card(x: dict) -> dict:
-    """Normalize to the keys RevealState expects."""
-    return {
-        "card_id":   x.get("card_id"),
-        "name":      x.get("name") or x.get("player") or x.get("printcode") or "Unknown",
-        "rarity":    x.get("rarity"),
-        "serial_no": x.get("serial_no") or x.get("serial"),
-        "image_ref": x.get("image_ref") or x.get("image_url"),
-    }
+    def get(self, user_id: int, key: str, default=None):
+        return self.file.fresh().get(str(user_id), {}).get(key, default)
+
+    def set(self, user_id: int, key: str, value):
+        try:
+            self.file.update(lambda d: d.setdefault(str(user_id), {}).__setitem__(key, value))
+        except Exception as e:
+            self.file.data.setdefault(str(user_id), {})[key] = value   # keep it for this process at least
+            print("[prefs] save failed:", e)
+
+prefs = UserPrefs(DATA_DIR / "prefs.json")
+_background_tasks: set[asyncio.Task] = set()
+
+def _spawn(coro) -> asyncio.Task:
+    """create_task that keeps a strong reference until the task finishes."""
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+async def _reveal_instant(interaction: discord.Interaction, pulls_sorted: list[dict], pack_name: str, god: bool):
+    """Whole pack in one message: summary + card embeds (chunked at Discord's 10-embed limit)."""
+    total = len(pulls_sorted)
+    cards = [_card_embed(c, i, total) for i, c in enumerate(pulls_sorted, 1)]
+    first = [_summary_embed(pulls_sorted, pack_name, god)] + cards[:MAX_EMBEDS - 1]
+    await interaction.followup.send(f"🎴 **{pack_name}** for {interaction.user.mention}", embeds=first)
+    rest = cards[MAX_EMBEDS - 1:]
+    for i in range(0, len(rest), MAX_EMBEDS):
+        await interaction.channel.send(embeds=rest[i:i + MAX_EMBEDS])
+    _announce_hype(interaction.user, pulls_sorted, pack_name, god)
+
+async def _reveal_auto(interaction: discord.Interaction, pulls_sorted: list[dict], pack_name: str, god: bool, back: discord.Embed):
+    """Flip every AUTO_REVEAL_DELAY_S by editing one message; the last edit carries the summary."""
+    msg = await interaction.followup.send(
+        f"🎴 **{pack_name}** for {interaction.user.mention} — auto-revealing!", embed=back, wait=True)
+
+    async def _run():
+        total = len(pulls_sorted)
+        try:
+            for i, card in enumerate(pulls_sorted, 1):
+                await asyncio.sleep(AUTO_REVEAL_DELAY_S)
+                emb = _card_embed(card, i, total)
+                if i == total:
+                    await msg.edit(embeds=[emb, _summary_embed(pulls_sorted, pack_name, god)])
+                else:
+                    await msg.edit(embed=emb)
+        except Exception as e:
+            print("[reveal] auto reveal failed:", e)
+        _announce_hype(interaction.user, pulls_sorted, pack_name, god)
+
+    # Don't hold the command (and the user's lock) for the whole animation.
+    _spawn(_run())
 
 async def start_reveal_session(
     interaction: discord.Interaction,
@@ -306,39 +2189,160 @@ async def start_reveal_session(
     pack_name: str,
     *,
     god: bool = False,
+    mode: str | None = None,
 ):
     if not pulls:
         await interaction.followup.send("No results returned.", ephemeral=True)
         return
 
-    pulls_norm = [_normalize_card(p) for p in pulls]
-    pulls_sorted = sorted(pulls_norm, key=lambda r: RARITY_ORDER.get((r.get("rarity") or ""), -1))
-    best = pulls_sorted[-1]
+    # One shared, sorted tuple of slotted records: the reveal session, embeds and hype all read it.
+    pulls_sorted = tuple(sorted(map(_normalize_card, pulls), key=rarity_rank))
+    # Fetch (and re-host) the art while the card back is on screen.
+    art_ready = _spawn(art_host.prepare(c.image_ref for c in pulls_sorted)) if ART_PREFETCH else None
 
-    await interaction.followup.send(f"🎴 **{pack_name}** for {interaction.user.mention} — let’s reveal here!")
+    mode = mode or prefs.get(interaction.user.id, "reveal_mode", "manual")
+    if mode not in REVEAL_MODES:
+        mode = "manual"
+    if mode == "instant":
+        if art_ready is not None:
+            await asyncio.wait({art_ready}, timeout=ART_PREPARE_WAIT_S)
+        return await _reveal_instant(interaction, pulls_sorted, pack_name, god)
 
     embed_back = discord.Embed(
-        title=f"{pack_name} — Tap to reveal",
-        description="We’ll flip 1-by-1. The last one is your best rarity. Use buttons below.",
+        title=f"{pack_name} — Tap to reveal" if mode == "manual" else pack_name,
+        description="We’ll flip 1-by-1. The last one is your best rarity."
+                    + (" Use buttons below." if mode == "manual" else ""),
         color=0x2B2D31,
     )
     if CARD_BACK_URL:
         embed_back.set_image(url=CARD_BACK_URL)
 
-    view = RevealState(pulls_sorted, interaction.user.id, pack_name, god, best)
-    await interaction.channel.send(embed=embed_back, view=view)
+    if mode == "auto":
+        return await _reveal_auto(interaction, pulls_sorted, pack_name, god, embed_back)
+
+    await interaction.followup.send(f"🎴 **{pack_name}** for {interaction.user.mention} — let’s reveal here!")
+    st = reveal_store.create(interaction.user.id, pack_name, god, pulls_sorted)
+    await interaction.channel.send(embed=embed_back, view=_reveal_view(st.sid))
+
+
+
+# --- Dex index (local card catalog for autocomplete) ---
+DEX_TYPE           = os.getenv("DEX_TYPE", "player")             # same filter ac_card_id always sent
+DEX_CATALOG_ACTION = os.getenv("DEX_CATALOG_ACTION", "dex_list")  # Worker action returning every card
+DEX_REFRESH_S      = float(os.getenv("DEX_REFRESH_S", "900"))
+READ_ONLY_ACTIONS.add(DEX_CATALOG_ACTION)
+LANE_BY_ACTION.setdefault(DEX_CATALOG_ACTION, "bulk")
 
+_TOKEN_SPLIT = re.compile(r"[^0-9a-z]+")
 
+class DexIndex:
+    """In-memory prefix/substring/token index over card_id, name and club.
+
+    Built off the event loop's hot path: `load()` swaps in a fully built index,
+    so `search()` never sees a half-populated state.
+    """
+
+    def __init__(self):
+        self.entries: list[tuple[str, str]] = []   # (card_id, label)
+        self.haystack: list[str] = []              # lowercase "id name club" per entry
+        self.ids: dict[str, int] = {}              # lowercase card_id -> entry
+        self.tokens: list[str] = []                # sorted distinct tokens
+        self.postings: dict[str, tuple[int, ...]] = {}
+        self.loaded_at = 0.0
+
+    @property
+    def ready(self) -> bool:
+        return bool(self.entries)
+
+    def load(self, items: list[dict]):
+        entries, haystack, ids, postings = [], [], {}, {}
+        for it in items:
+            cid = str(it.get("card_id") or it.get("value") or "").strip()
+            if not cid or cid.lower() in ids:
+                continue
+            name = str(it.get("name") or it.get("player") or "").strip()
+            club = str(it.get("club") or it.get("Club") or "").strip()
+            rarity = str(it.get("rarity") or "").strip()
+            label = it.get("label") or " · ".join(b for b in (name or cid, club, rarity) if b)
+            i = len(entries)
+            entries.append((cid, str(label)))
+            hay = f"{cid} {name} {club}".lower()
+            haystack.append(hay)
+            ids[cid.lower()] = i
+            for tok in set(_TOKEN_SPLIT.split(hay)):
+                if tok:
+                    postings.setdefault(tok, []).append(i)
+        self.entries, self.haystack, self.ids = entries, haystack, ids
+        self.postings = {k: tuple(v) for k, v in postings.items()}
+        self.tokens = sorted(self.postings)
+        self.loaded_at = time.monotonic()
+
+    def _prefix(self, term: str) -> set[int]:
+        out: set[int] = set()
+        lo = bisect.bisect_left(self.tokens, term)
+        for tok in self.tokens[lo:]:
+            if not tok.startswith(term):
+                break
+            out.update(self.postings[tok])
+        return out
+
+    def search(self, query: str, limit: int = 25) -> list[tuple[str, str]]:
+        q = (query or "").strip().lower()
+        terms = [t for t in _TOKEN_SPLIT.split(q) if t]
+        if not terms:
+            return []
+        hits: set[int] | None = None
+        for t in terms:
+            found = self._prefix(t)
+            hits = found if hits is None else hits & found
+            if not hits:
+                break
+        if not hits:
+            # Substring fallback (e.g. "aldo" -> "Ronaldo"); linear but only on a miss.
+            hits = {i for i, h in enumerate(self.haystack) if q in h}
+        exact = self.ids.get(q)
+        def rank(i):
+            label = self.entries[i][1].lower()
+            return (i != exact, not label.startswith(q), label)
+        return [self.entries[i] for i in heapq.nsmallest(limit, hits, key=rank)]
+
+dex_index = DexIndex()
+
+async def refresh_dex_index():
+    res = await call_sheet(DEX_CATALOG_ACTION, {"type": DEX_TYPE})
+    data = res.get("data", res) if isinstance(res, dict) else {}
+    items = (data.get("items") or data.get("cards") or []) if isinstance(data, dict) else (data or [])
+    if not items:
+        raise RuntimeError(f"{DEX_CATALOG_ACTION} returned no cards")
+    dex_index.load(items)
+    print(f"[dex] indexed {len(dex_index.entries)} cards")
+
+async def _dex_refresh_loop():
+    while not bot.is_closed():
+        try:
+            await refresh_dex_index()
+        except Exception as e:
+            print("[dex] refresh failed:", e)
+        await asyncio.sleep(DEX_REFRESH_S if dex_index.ready else min(60.0, DEX_REFRESH_S))
 
 # --- Autocomplete: card_id from Dex (name/club/ID search) ---
 async def ac_card_id(itx: discord.Interaction, current: str):
     q = (current or "").strip()
     if not q:
         return []
+    t0 = time.perf_counter()
+    if dex_index.ready:
+        out = [
+            app_commands.Choice(name=f"{label} — {cid}"[:100], value=cid)
+            for cid, label in dex_index.search(q, 25)
+        ]
+        metrics.observe("tlk_autocomplete_seconds", (("source", "local"),), time.perf_counter() - t0)
+        return out
+    # Cold index: ask the Worker.
     try:
         res = await call_sheet("dex_autocomplete", {
             "query": q,
-            "type": "player",   # change to "ALL" if you want managers/stadiums, etc.
+            "type": DEX_TYPE,   # same catalog slice the local index loads
             "limit": 25
         })
         data  = res.get("data", res) if isinstance(res, dict) else {}
@@ -353,6 +2357,7 @@ async def ac_card_id(itx: discord.Interaction, current: str):
             # Show label + the ID so users feel confident
             shown = f"{label} — {value}"
             out.append(app_commands.Choice(name=shown[:100], value=value))
+        metrics.observe("tlk_autocomplete_seconds", (("source", "remote"),), time.perf_counter() - t0)
         return out
     except Exception:
         # Fail quietly to keep autocomplete snappy
@@ -363,43 +2368,85 @@ async def ac_card_id(itx: discord.Interaction, current: str):
 # --- Commands ---
 @bot.tree.command(name="ping", description="Test command that replies immediately")
 @app_commands.guilds(discord.Object(id=GID))
+@instrumented
 async def ping(interaction: discord.Interaction):
     await interaction.response.send_message("pong ✅", ephemeral=True)
 
 
+BALANCE_ACTION_RETRY_S = float(os.getenv("BALANCE_ACTION_RETRY_S", "600"))
+_balance_action_down_until = 0.0
+
+def _unknown_action(e: APIRejected) -> bool:
+    """The Worker doesn't implement the action at all, as opposed to refusing this user."""
+    msg = str(e).lower()
+    return e.status in (404, 501) or ("action" in msg and any(w in msg for w in ("unknown", "unsupported", "not found", "invalid")))
+
+async def fetch_balance(user_id: str) -> dict:
+    """Tickets/tokens for a user: cache, then the `balance` action, then the collection query."""
+    global _balance_action_down_until
+    cached = balance_cache.get(user_id)
+    if cached is not None:
+        return cached
+    if time.monotonic() >= _balance_action_down_until:
+        # Only a Worker that doesn't know `balance` (or answers without balances) sends us to
+        # the collection query; a rejection for this user, timeouts, overload and an open
+        # circuit propagate, since the heavier query would only add load to a struggling Worker.
+        try:
+            found = _extract_balances("balance", await call_sheet("balance", {"user_id": user_id}))
+        except APIRejected as e:
+            if not _unknown_action(e):
+                raise
+            print("[balance] action unknown to the Worker, using collection:", e)
+        else:
+            if all(cur in found for cur in CURRENCIES):
+                return found
+            print("[balance] action returned no balances, using collection")
+        _balance_action_down_until = time.monotonic() + BALANCE_ACTION_RETRY_S
+    data = await call_sheet("collection", {
+        "user_id": user_id,
+        "page": 1,
+        "page_size": 1,
+        "unique_only": False,
+        "rarity": "ALL",
+        "position": "ALL",
+        "batch": "ALL",
+    })
+    found = _extract_balances("collection", data)
+    return {cur: found.get(cur, 0) for cur in CURRENCIES}
+
 @bot.tree.command(name="balance", description="Show your Tickets and Tokens")
 @app_commands.guilds(discord.Object(id=GID))
+@instrumented
 async def balance(interaction: discord.Interaction):
     if not await ensure_channel(interaction):
         return
     await interaction.response.defer(ephemeral=True, thinking=True)
-    def to_int(x):
-        try:
-            return int(float(x))
-        except Exception:
-            return 0
     try:
-        data = await call_sheet("collection", {
-            "user_id": str(interaction.user.id),
-            "page": 1,
-            "page_size": 1,
-            "unique_only": False,
-            "rarity": "ALL",
-            "position": "ALL",
-            "batch": "ALL",
-        })
-        bal = (data or {}).get("balances") or {}
-        tickets = to_int(bal.get("tickets", 0))
-        tokens_ = to_int(bal.get("tokens", 0))
+        bal = await fetch_balance(str(interaction.user.id))
         await interaction.followup.send(
-            f"🎟️ Tickets: **{tickets}**\n🪙 Tokens: **{tokens_}**",
+            f"🎟️ Tickets: **{bal['tickets']}**\n🪙 Tokens: **{bal['tokens']}**",
             ephemeral=True,
         )
     except Exception as e:
-        await interaction.followup.send(f"⚠️ Error: {e}", ephemeral=True)
+        await reply_error(interaction, f"⚠️ Error: {e}")
+
+def _draw_pulls(body: dict) -> list[dict]:
+    """Cards from a last_draw row: `results` (decoded once in _post_action), or a raw result_json column."""
+    pulls = []
+    if "result_json" in body:
+        try:
+            parsed = json_loads(body["result_json"])
+            if isinstance(parsed, list):
+                pulls = parsed
+        except Exception:
+            pass
+    if not pulls and isinstance(body.get("results"), list):
+        pulls = body["results"]
+    return pulls
 
 @bot.tree.command(name="last_pack", description="Show your most recent pack (no cost)")
 @app_commands.guilds(discord.Object(id=GID))
+@instrumented
 async def last_pack(interaction: discord.Interaction):
     if not await ensure_channel(interaction):
         return
@@ -411,19 +2458,7 @@ async def last_pack(interaction: discord.Interaction):
         # --- Ask API for the latest draw row for this user ---
         last = await call_sheet("last_draw", {"user_id": str(interaction.user.id)})
         body = last.get("data", last) if isinstance(last, dict) else {}
-
-        # Parse the result_json column
-        pulls = []
-        if "result_json" in body:
-            try:
-                parsed = json.loads(body["result_json"])
-                if isinstance(parsed, list):
-                    pulls = parsed
-            except Exception:
-                pass
-        # Fallback: if API already parsed
-        if not pulls and isinstance(body.get("results"), list):
-            pulls = body["results"]
+        pulls = _draw_pulls(body)
 
         if not pulls:
             await interaction.followup.send("No recent pack found for you.", ephemeral=True)
@@ -435,33 +2470,23 @@ async def last_pack(interaction: discord.Interaction):
         pulled = pulls[:PACK_SIZE]
 
         # --- Build response embed exactly from those pulls ---
-        lines = []
-        for i, it in enumerate(pulled, 1):
-            name   = it.get("name") or it.get("player") or it.get("printcode") or it.get("card_id") or "Unknown"
-            rarity = (it.get("rarity") or "").strip()
-            club   = it.get("club") or it.get("Club") or ""
-            pos    = it.get("position") or ""
-            serial = it.get("serial") or it.get("serial_no")
-            serial_txt = f" #{serial}" if serial not in (None, "", 0) else ""
-            bits = [rarity, club, pos]
-            line = f"{i}. **{name}** · {' • '.join([b for b in bits if b])}{serial_txt}"
-            lines.append(line)
-
         emb = discord.Embed(
             title=f"Your most recent pack — {pack_name}",
-            description="\n".join(lines),
+            description="\n".join(detail_lines(pulled)),
             color=discord.Color.gold(),
         )
         await interaction.followup.send(embed=emb, ephemeral=True)
 
     except Exception as e:
-        await interaction.followup.send(f"⚠️ Error: {e}", ephemeral=True)
+        await reply_error(interaction, f"⚠️ Error: {e}")
 
 
 @bot.tree.command(description="Sell one duplicate of a specific card_id (keeps your first copy).")
 @app_commands.guilds(discord.Object(id=GID))
 @app_commands.describe(card_id="Exact card_id from the card list (e.g., PLR123)")
 @app_commands.autocomplete(card_id=ac_card_id)
+@instrumented
+@per_user_serialized()
 async def sell(interaction: discord.Interaction, card_id: str):
     if not await ensure_channel(interaction):
         return await interaction.response.send_message(f"Use this in <#{COMMAND_CHANNEL_ID}>.", ephemeral=True)
@@ -477,10 +2502,12 @@ async def sell(interaction: discord.Interaction, card_id: str):
             ephemeral=True,
         )
     except Exception as e:
-        await interaction.followup.send(f"Error: {e}", ephemeral=True)
+        await reply_error(interaction, f"Error: {e}")
 
 @bot.tree.command(description="Sell all duplicates (keeps 1 of each).")
 @app_commands.guilds(discord.Object(id=GID))
+@instrumented
+@per_user_serialized()
 async def sell_all_dupes(interaction: discord.Interaction):
     if not await ensure_channel(interaction):
         return await interaction.response.send_message(f"Use this in <#{COMMAND_CHANNEL_ID}>.", ephemeral=True)
@@ -495,97 +2522,254 @@ async def sell_all_dupes(interaction: discord.Interaction):
             ephemeral=True,
         )
     except Exception as e:
-        await interaction.followup.send(f"Error: {e}", ephemeral=True)
+        await reply_error(interaction, f"Error: {e}")
+
+# --- /open (idempotent: one request_id per command, reused by retries + recovery) ---
+DRAW_CLOCK_SKEW_MS = int(float(os.getenv("DRAW_CLOCK_SKEW_S", "5")) * 1000)   # Worker clock may lag ours
+
+async def _draw_by_request_id(user_id: str, request_id: str, started_ms: int):
+    """Look up the draw a given /open produced. Returns (cards, body) or None if it never landed."""
+    last = await call_sheet("last_draw", {"user_id": user_id, "request_id": request_id})
+    body = last.get("data", last) if isinstance(last, dict) else {}
+    if not isinstance(body, dict):
+        return None
+    echoed = body.get("request_id") or body.get("idempotency_key")
+    if echoed:
+        if echoed != request_id:
+            return None
+    else:
+        # Worker didn't echo the key: only trust a draw made after this command started,
+        # give or take the clock skew between us and the Worker.
+        try:
+            ts = float(body.get("ts") or body.get("created_ts") or body.get("drawn_ts") or 0)
+        except (TypeError, ValueError):
+            ts = 0
+        if 0 < ts < 1e11:
+            ts *= 1000   # epoch seconds
+        if ts < started_ms - DRAW_CLOCK_SKEW_MS:
+            return None
+    cards = [_normalize_card(x) for x in _draw_pulls(body)]
+    return (cards, body) if cards else None
+
+# --- Multi-pack open ---
+MAX_MULTI_OPEN         = int(os.getenv("MAX_MULTI_OPEN", "10"))
+MULTI_OPEN_CONCURRENCY = int(os.getenv("MULTI_OPEN_CONCURRENCY", "3"))  # single opens in flight when the Worker can't batch
+
+def _extract_pack(res):
+    body = res.get("data", res) if isinstance(res, dict) else res
+    if isinstance(body, dict) and body.get("error"):
+        raise RuntimeError(str(body["error"]))
+    raw = []
+    if isinstance(body, dict):
+        raw = body.get("results") or body.get("pulls") or body.get("cards") or body.get("items") or []
+    return [_normalize_card(x) for x in raw], (body if isinstance(body, dict) else {})
+
+async def _open_one(selector: str, user_id: str, request_id: str, **extra):
+    # If value looks like a legacy action (e.g., "open_base"), call it directly.
+    # Otherwise treat it as a manifest pack_id and call the generic endpoint.
+    if selector.startswith("open_"):
+        return await call_sheet(selector, {"user_id": user_id, "request_id": request_id, **extra})
+    return await call_sheet("open_pack", {"user_id": user_id, "pack_id": selector, "request_id": request_id, **extra})
+
+async def _open_many(selector: str, user_id: str, request_id: str, count: int):
+    """Open `count` packs: one batched call if the Worker returns `packs`, else bounded single opens.
+       Returns ([(cards, body), ...], failures)."""
+    res = await _open_one(selector, user_id, request_id, count=count)
+    body = res.get("data", res) if isinstance(res, dict) else {}
+    if isinstance(body, dict) and isinstance(body.get("packs"), list):
+        return [_extract_pack(p) for p in body["packs"]], 0
+    # Worker ignored `count` and opened one pack; open the rest individually.
+    opened = [_extract_pack(res)]
+    sem = asyncio.Semaphore(MULTI_OPEN_CONCURRENCY)
+    async def _single(i):
+        async with sem:
+            return _extract_pack(await _open_one(selector, user_id, f"{request_id}:{i}"))
+    results = await asyncio.gather(*(_single(i) for i in range(1, count)), return_exceptions=True)
+    failures = 0
+    for r in results:
+        if isinstance(r, BaseException):
+            print("[open] multi single open failed:", r)
+            failures += 1
+        else:
+            opened.append(r)
+    return opened, failures
+
+async def _recover_many(user_id: str, request_id: str, count: int, started_ms: int):
+    """Packs of a failed multi-open that landed anyway, looked up by their per-pack keys
+       (`request_id`, then `request_id:1`…, as sent by the batched and the single-open paths)."""
+    sem = asyncio.Semaphore(MULTI_OPEN_CONCURRENCY)
+    async def _one(key):
+        async with sem:
+            return await _draw_by_request_id(user_id, key, started_ms)
+    keys = [request_id] + [f"{request_id}:{i}" for i in range(1, count)]
+    found, seen = [], set()
+    for r in await asyncio.gather(*(_one(k) for k in keys), return_exceptions=True):
+        if not r or isinstance(r, BaseException):
+            continue
+        # A Worker that doesn't echo keys answers every lookup with the same latest draw.
+        sig = tuple(c.row() for c in r[0])
+        if sig not in seen:
+            seen.add(sig)
+            found.append(r)
+    return found
+
+class PackPager(discord.ui.View):
+    """Highlights embed on top, one page per pack underneath, ◀ ▶ to flip."""
+
+    def __init__(self, owner_id: int, header: discord.Embed, pages: list[discord.Embed]):
+        super().__init__(timeout=600)
+        self.owner_id = owner_id
+        self.header = header
+        self.pages = pages
+        self.index = 0
+        self._sync_buttons()
+
+    def embeds(self) -> list[discord.Embed]:
+        return [self.header, self.pages[self.index]]
+
+    def _sync_buttons(self):
+        self.prev_page.disabled = self.index == 0
+        self.next_page.disabled = self.index >= len(self.pages) - 1
+
+    async def _flip(self, itx: discord.Interaction, step: int):
+        if itx.user.id != self.owner_id:
+            return await itx.response.send_message("Only the pack opener can use this.", ephemeral=True)
+        self.index = max(0, min(len(self.pages) - 1, self.index + step))
+        self._sync_buttons()
+        await itx.response.edit_message(embeds=self.embeds(), view=self)
+
+    @discord.ui.button(label="◀", style=discord.ButtonStyle.secondary)
+    async def prev_page(self, itx: discord.Interaction, _button: discord.ui.Button):
+        await self._flip(itx, -1)
+
+    @discord.ui.button(label="▶", style=discord.ButtonStyle.secondary)
+    async def next_page(self, itx: discord.Interaction, _button: discord.ui.Button):
+        await self._flip(itx, +1)
+
+def _highlights_embed(packs_sorted: list[list[dict]], pack_name: str, gods: int) -> discord.Embed:
+    pulls = sorted((c for p in packs_sorted for c in p), key=rarity_rank, reverse=True)
+    counts = rarity_tally(pulls)
+    top = [c for c in pulls if _fields(c)[1] in ("SR", "SSR")][:10]
+    lines = [counts]
+    if gods:
+        lines.append(f"🎉 **{gods} GOD PACK{'S' if gods > 1 else ''}!**")
+    if top:
+        lines.append("**Highlights**")
+        lines.extend(map(highlight_line, top))
+    return discord.Embed(
+        title=f"{pack_name} ×{len(packs_sorted)} — {len(pulls)} cards",
+        description="\n".join(lines),
+        color=0xFFD166 if gods or any(_fields(c)[1] == "SSR" for c in top) else 0x57F287,
+    )
+
+async def start_multi_reveal(interaction: discord.Interaction, packs: list[tuple[list[dict], dict]], pack_name: str):
+    """One message for N packs: highlights + paginated per-pack results, and a single hype post."""
+    packs = [(sorted(cards, key=rarity_rank), body) for cards, body in packs if cards]
+    if not packs:
+        await interaction.followup.send("No results returned.", ephemeral=True)
+        return
+    gods = sum(1 for _, body in packs if body.get("godPack"))
+    header = _highlights_embed([cards for cards, _ in packs], pack_name, gods)
+    pages = [
+        _summary_embed(cards, f"{body.get('pack_name') or pack_name} — Pack {i}/{len(packs)}", bool(body.get("godPack")))
+        for i, (cards, body) in enumerate(packs, 1)
+    ]
+    view = PackPager(interaction.user.id, header, pages)
+    await interaction.followup.send(f"🎴 **{pack_name} ×{len(packs)}** for {interaction.user.mention}",
+                                    embeds=view.embeds(), view=view)
+    all_sorted = sorted((c for cards, _ in packs for c in cards), key=rarity_rank)
+    _announce_hype(interaction.user, all_sorted, f"{pack_name} ×{len(packs)}", gods > 0)
 
-# --- /open (with pack options + timeout recovery) ---
 @bot.tree.command(name="open", description="Open a pack")
 @app_commands.guilds(discord.Object(id=GID))
-@app_commands.describe(pack="Which pack to open")
+@app_commands.describe(
+    pack="Which pack to open",
+    reveal="How to reveal a single pack (defaults to your /reveal_mode; several packs use the pager)",
+    count=f"How many packs to open at once (1–{MAX_MULTI_OPEN})",
+)
 @app_commands.autocomplete(pack=_pack_autocomplete)
-async def open_pack(interaction: discord.Interaction, pack: str = "Base Pack"):
+@app_commands.choices(reveal=REVEAL_CHOICES)
+@instrumented
+@per_user_serialized()
+async def open_pack(
+    interaction: discord.Interaction,
+    pack: str = "Base Pack",
+    reveal: app_commands.Choice[str] | None = None,
+    count: app_commands.Range[int, 1, MAX_MULTI_OPEN] = 1,
+):
     if not await ensure_channel(interaction):
         return
     await interaction.response.defer(thinking=True)
 
-    user_id   = str(interaction.user.id)
-    PACK_SIZE = 5
+    user_id    = str(interaction.user.id)
+    request_id = uuid.uuid4().hex  # idempotency key: the Worker returns the original draw on replay
     started_ms = int(time.time() * 1000)
 
     selector = PACK_ACTIONS.get(pack) or "open_base"
 
-    def _extract(res):
-        body = res.get("data", res) if isinstance(res, dict) else res
-        if isinstance(body, dict) and body.get("error"):
-            raise RuntimeError(str(body["error"]))
-        raw = []
-        if isinstance(body, dict):
-            raw = body.get("results") or body.get("pulls") or body.get("cards") or body.get("items") or []
-        return [_normalize_card(x) for x in raw], (body if isinstance(body, dict) else {})
-
-    async def _recover_from_collection():
-        col = await call_sheet("collection", {
-            "user_id": user_id,
-            "page": 1,
-            "page_size": PACK_SIZE * 2,
-            "unique_only": False,
-            "rarity": "ALL", "position": "ALL", "batch": "ALL",
-        })
-        items = (col or {}).get("items") or []
-        def ts(it):
-            try: return int(it.get("acquired_ts") or it.get("ts") or 0)
-            except: return 0
-        recent = [it for it in items if ts(it) >= started_ms - 200000]
-        pool = recent[:PACK_SIZE] or items[:PACK_SIZE]
-        return [_normalize_card(it) for it in pool]
+    if count > 1:
+        try:
+            packs, failures = await _open_many(selector, user_id, request_id, count)
+            await start_multi_reveal(interaction, packs, pack)
+            if failures:
+                await reply_error(interaction, f"⚠️ {failures} of {count} packs failed to open — check `/last_pack` or try again.")
+        except Exception as e:
+            # Same recovery as a single open: every pack has its own key, so look up the ones that landed.
+            msg = str(e)
+            if isinstance(e, APIError) and e.retryable:
+                try:
+                    found = await _recover_many(user_id, request_id, count, started_ms)
+                    if found:
+                        await start_multi_reveal(interaction, found, f"Recovered — {pack}")
+                        if len(found) < count:
+                            await reply_error(
+                                interaction, f"⚠️ Only {len(found)} of {count} packs could be confirmed — check `/last_pack` before retrying.")
+                        return
+                except Exception as e2:
+                    msg += f" | recovery: {e2}"
+            await reply_error(
+                interaction, f"⚠️ Error opening packs: {msg}\nSome packs may still have opened — check `/last_pack` before retrying.")
+        return
 
-    try:
-        # If value looks like a legacy action (e.g., "open_base"), call it directly.
-        # Otherwise treat it as a manifest pack_id and call the generic endpoint.
-        if selector.startswith("open_"):
-            res = await call_sheet(selector, {"user_id": user_id})
-        else:
-            res = await call_sheet("open_pack", {"user_id": user_id, "pack_id": selector})
+    async def _open():
+        return _extract_pack(await _open_one(selector, user_id, request_id))
 
-        cards, body = _extract(res)
+    async def _reveal(cards, body, recovered=False):
+        pack_name = body.get("pack_name") or body.get("pack_id") or pack
+        await start_reveal_session(
+            interaction,
+            cards,
+            pack_name=f"Recovered — {pack_name}" if recovered else pack_name,
+            god=bool(body.get("godPack")),
+            mode=reveal.value if reveal else None,
+        )
+
+    try:
+        cards, body = await _open()
         if cards:
-            pack_name = body.get("pack_name") or pack
-            await start_reveal_session(
-                interaction,
-                cards,
-                pack_name=pack_name,
-                god=bool(body.get("godPack")),
-            )
-            return
-        recovered = await _recover_from_collection()
-        if recovered:
-            await start_reveal_session(
-                interaction,
-                recovered,
-                pack_name=f"Recovered — {pack}",
-                god=False,
-            )
-        else:
-            await interaction.followup.send("⚠️ Pack did not open (no new cards). Please try again.", ephemeral=True)
+            return await _reveal(cards, body)
+        found = await _draw_by_request_id(user_id, request_id, started_ms)
+        if found:
+            return await _reveal(*found, recovered=True)
+        await reply_error(interaction, "⚠️ Pack did not open (no new cards). Please try again.")
     except Exception as e:
+        # call_sheet only replays the open when it never reached the Worker (or the
+        # Worker dedupes request_id); otherwise check whether the draw landed.
         msg = str(e)
-        if any(x in msg.lower() for x in ("upstream_timeout", "502", "bad gateway", "timeout")):
+        if isinstance(e, APIError) and e.retryable:
             try:
-                recovered = await _recover_from_collection()
-                if recovered:
-                    await start_reveal_session(
-                        interaction,
-                        recovered,
-                        pack_name=f"Recovered — {pack}",
-                        god=False,
-                    )
-                    return
+                found = await _draw_by_request_id(user_id, request_id, started_ms)
+                if found:
+                    return await _reveal(*found, recovered=True)
             except Exception as e2:
                 msg += f" | recovery: {e2}"
-        await interaction.followup.send(f"⚠️ Error opening pack: {msg}", ephemeral=True)
+        await reply_error(interaction, f"⚠️ Error opening pack: {msg}")
 
 # --- Starter ---
 @bot.tree.command(name="starter", description="Claim your one-time Starter Pack and reveal it (worst → best).")
 @app_commands.guilds(discord.Object(id=GID))
+@instrumented
+@per_user_serialized()
 async def starter(interaction: discord.Interaction):
     if not await ensure_channel(interaction):
         return await interaction.response.send_message(f"Use this in <#{COMMAND_CHANNEL_ID}>.", ephemeral=True)
@@ -606,7 +2790,7 @@ async def starter(interaction: discord.Interaction):
         if "starter" in msg.lower() or "claimed" in msg.lower():
             await interaction.followup.send("You’ve already claimed your Starter Pack.", ephemeral=True)
         else:
-            await interaction.followup.send(f"Error: {e}", ephemeral=True)
+            await reply_error(interaction, f"Error: {e}")
 
 # --- Admin grant ---
 @bot.tree.command(name="grant", description="Admin: grant tickets to a user or everyone.")
@@ -617,6 +2801,7 @@ async def starter(interaction: discord.Interaction):
     grant_all="Grant to all active players",
     reason="Reason for the grant"
 )
+@instrumented
 async def grant(
     interaction: discord.Interaction,
     amount: int,
@@ -693,21 +2878,310 @@ async def grant(
         )
 
     except Exception as e:
-        await interaction.followup.send(f"⚠️ Error: {e}", ephemeral=True)
+        await reply_error(interaction, f"⚠️ Error: {e}")
 
 
 
 # --- Collection ---
+try:
+    from PIL import Image, ImageDraw, ImageOps
+except ImportError:     # Pillow is optional: without it /collection stays text-only
+    Image = None
+
+GALLERY_COLS        = 5
+GALLERY_TILE        = (180, 252)                                   # card thumbnail (w, h)
+GALLERY_WORKERS     = int(os.getenv("GALLERY_WORKERS", "2"))         # render threads
+GALLERY_CACHE_PAGES = int(os.getenv("GALLERY_CACHE_PAGES", "128"))   # rendered PNGs kept in RAM
+GALLERY_FILENAME    = "collection.png"
+GALLERY_WAIT_S      = float(os.getenv("GALLERY_WAIT_S", "1.5"))      # longer renders reply text-only, finish in background
+
+_render_pool = ThreadPoolExecutor(max_workers=max(1, GALLERY_WORKERS), thread_name_prefix="gallery")
+
+def _render_grid(blobs: list, labels: list[str]) -> bytes:
+    """Runs on _render_pool. Pastes each card image (grey tile if missing) into one PNG sheet."""
+    w, h = GALLERY_TILE
+    pad, label_h = 8, 16
+    cols = max(1, min(GALLERY_COLS, len(blobs)))
+    rows = -(-len(blobs) // cols)
+    sheet = Image.new("RGB", (pad + cols * (w + pad), pad + rows * (h + label_h + pad)), (43, 45, 49))
+    draw = ImageDraw.Draw(sheet)
+    for i, (blob, label) in enumerate(zip(blobs, labels)):
+        x = pad + (i % cols) * (w + pad)
+        y = pad + (i // cols) * (h + label_h + pad)
+        tile = None
+        if blob:
+            try:
+                with Image.open(io.BytesIO(blob)) as im:
+                    im.draft("RGB", (w, h))   # JPEG: decode at reduced scale
+                    tile = ImageOps.fit(im.convert("RGB"), (w, h))
+            except Exception:
+                tile = None
+        if tile is None:
+            draw.rectangle((x, y, x + w - 1, y + h - 1), fill=(70, 72, 78))
+        else:
+            sheet.paste(tile, (x, y))
+        draw.text((x + 2, y + h + 2), label, fill=(230, 230, 230))
+    buf = io.BytesIO()
+    sheet.save(buf, "PNG", compress_level=3)
+    return buf.getvalue()
+
+class GalleryRenderer:
+    """Rendered page PNGs, keyed by the page's image URLs + labels, LRU-bounded."""
+
+    def __init__(self, art: ArtCache, max_pages: int):
+        self.art = art
+        self.max_pages = max_pages
+        self._pages: OrderedDict[tuple, bytes] = OrderedDict()
+        self._inflight: dict[tuple, asyncio.Future] = {}
+
+    @staticmethod
+    def _key(items: list[dict], first: int) -> tuple:
+        return tuple(
+            (it.get("image_ref") or it.get("image_url") or "", f"{n}. {it.get('rarity', '')}")
+            for n, it in enumerate(items, start=first)
+        )
+
+    def cached(self, items: list[dict], first: int) -> bool:
+        return Image is None or self._key(items, first) in self._pages
+
+    async def page_png(self, items: list[dict], first: int) -> bytes | None:
+        if Image is None or not items:
+            return None
+        key = self._key(items, first)
+        if not any(url for url, _ in key):
+            return None
+        png = self._pages.get(key)
+        if png is not None:
+            self._pages.move_to_end(key)
+            return png
+        fut = self._inflight.get(key)
+        if fut is None:
+            fut = self._inflight[key] = asyncio.ensure_future(self._render(key))
+            fut.add_done_callback(lambda f: (self._inflight.pop(key, None), f.cancelled() or f.exception()))
+        return await asyncio.shield(fut)   # a caller that stops waiting leaves the render running
+
+    async def _render(self, key: tuple) -> bytes:
+        blobs = await asyncio.gather(*(self.art.get(url) for url, _ in key))
+        t0 = time.perf_counter()
+        png = await asyncio.get_running_loop().run_in_executor(
+            _render_pool, _render_grid, list(blobs), [label for _, label in key])
+        metrics.observe("tlk_gallery_render_seconds", (), time.perf_counter() - t0)
+        self._pages[key] = png
+        while len(self._pages) > self.max_pages:
+            self._pages.popitem(last=False)
+        return png
+
+gallery = GalleryRenderer(art_cache, GALLERY_CACHE_PAGES)
 RARITY_CHOICES = [app_commands.Choice(name=x, value=x) for x in ["ALL","N","R","AR","SR","SSR"]]
 POSITION_CHOICES = [app_commands.Choice(name=x, value=x) for x in [
     "ALL","GK","ST","LW","RW","AM","CM","DM","LB","RB","CB"
 ]]
 BATCH_CHOICES = [app_commands.Choice(name=x, value=x) for x in ["ALL","Base","Base U"]]
 
+COLLECTION_PAGE_SIZE = 10                                          # cards per embed page
+COLLECTION_CHUNK     = int(os.getenv("COLLECTION_CHUNK", "50"))   # cards per backend request
+
+def _collection_embed(owner_name: str, filt: dict, meta: dict, items: list[dict], page: int, pages: int | None,
+                      with_image: bool = False) -> discord.Embed:
+    counts = meta.get("counts") or {}
+    total = meta.get("total", len(items))
+    summary = " | ".join([f"{k}: {v}" for k, v in counts.items()]) if counts else ""
+    emb = discord.Embed(
+        title=f"{owner_name} — Collection",
+        description=(f"{summary}\nFilters: R={filt['rarity']} • Pos={filt['position']} • Batch={filt['batch']}"
+                     + (" • Unique only" if filt["unique_only"] else "")),
+        color=0x2B2D31,
+    )
+    emb.set_footer(text=f"Page {page}" + (f"/{pages}" if pages else "") + f" • Showing {len(items)} of {total}")
+    first = (page - 1) * COLLECTION_PAGE_SIZE
+    page_items = items[:COLLECTION_PAGE_SIZE]
+    for label, it in zip(collection_labels(page_items, first + 1), page_items):
+        emb.add_field(name=label, value=it.get("card_id",""), inline=False)
+    if with_image:
+        emb.set_image(url=f"attachment://{GALLERY_FILENAME}")
+    return emb
+
+class _JumpModal(discord.ui.Modal, title="Jump to page"):
+    page = discord.ui.TextInput(label="Page number", max_length=6)
+
+    def __init__(self, browser: "CollectionBrowser"):
+        super().__init__(timeout=120)
+        self.browser = browser
+
+    async def on_submit(self, itx: discord.Interaction):
+        try:
+            target = int(str(self.page.value).strip())
+        except ValueError:
+            return await itx.response.send_message("That’s not a page number.", ephemeral=True)
+        await self.browser.show(itx, target)
+
+class CollectionBrowser(discord.ui.View):
+    """Paginated /collection: pages are sliced from COLLECTION_CHUNK-sized backend chunks,
+       cached for the session, with the next chunk prefetched in the background."""
+
+    def __init__(self, owner_id: int, owner_name: str, filt: dict):
+        super().__init__(timeout=300)
+        self.owner_id = owner_id
+        self.owner_name = owner_name
+        self.filt = filt
+        self.chunk = COLLECTION_CHUNK
+        self.chunks: dict[int, list[dict]] = {}
+        self._pending: dict[int, asyncio.Task] = {}
+        self.meta: dict = {}
+        self.page = 1
+
+    @property
+    def pages(self) -> int | None:
+        total = self.meta.get("total")
+        try:
+            return max(1, -(-int(total) // COLLECTION_PAGE_SIZE))
+        except (TypeError, ValueError):
+            return None
+
+    async def _fetch_chunk(self, idx: int) -> list[dict]:
+        size = self.chunk
+        data = await call_sheet("collection", {**self.filt, "page": idx + 1, "page_size": size})
+        items = list(data.get("items", []))
+        if not self.meta:
+            self.meta = {"counts": data.get("counts", {}), "total": data.get("total", len(items))}
+            # Backend capped page_size below what we asked for: map pages onto its real size.
+            # A short tail chunk (opening on the last page) is exactly what's expected, not a cap.
+            if self.pages and items and len(items) != max(0, min(size, int(self.meta["total"]) - idx * size)):
+                cap = len(items)
+                if idx:
+                    # A capped tail can't be told from a capped full chunk; the first chunk can.
+                    first = await call_sheet("collection", {**self.filt, "page": 1, "page_size": size})
+                    cap = len(first.get("items", []))
+                if 0 < cap < size:
+                    self.chunk = size = cap
+                    self.chunks.clear()
+                    self._pending.clear()
+                    if idx:
+                        self.chunks[0] = list(first.get("items", []))
+        if self.chunk != size:
+            return items  # fetched under the old size; its index no longer lines up
+        self.chunks[idx] = items
+        return items
+
+    def _load(self, idx: int) -> asyncio.Task:
+        task = self._pending.get(idx)
+        if task is None:
+            task = self._pending[idx] = _spawn(self._fetch_chunk(idx))
+            task.add_done_callback(lambda t, idx=idx: self._pending.get(idx) is t and self._pending.pop(idx))
+        return task
+
+    def _span(self, page: int) -> tuple[int, range]:
+        """(page start offset, chunk indexes covering it) under the current chunk size.
+           A page can straddle two chunks when the Worker's page_size isn't a multiple of 10."""
+        start = (page - 1) * COLLECTION_PAGE_SIZE
+        return start, range(start // self.chunk, (start + COLLECTION_PAGE_SIZE - 1) // self.chunk + 1)
+
+    def _slice(self, start: int, idxs: range, chunks: list[list[dict]]) -> list[dict]:
+        items = [it for c in chunks for it in c]
+        off = start - idxs[0] * self.chunk
+        return items[off:off + COLLECTION_PAGE_SIZE]
+
+    async def page_items(self, page: int) -> list[dict]:
+        while True:
+            chunk = self.chunk
+            start, idxs = self._span(page)
+            got = []
+            for idx in idxs:
+                items = self.chunks.get(idx)
+                if items is None:
+                    items = await self._load(idx)
+                got.append(items)
+                if len(items) < chunk:
+                    break   # end of the collection
+            if self.chunk == chunk:
+                break
+            # The first fetch learned the Worker's real page size: remap the page onto it.
+        # Warm the following chunk while the user reads this one.
+        nxt = idxs[len(got) - 1] + 1
+        if nxt not in self.chunks and got and len(got[-1]) >= self.chunk:
+            self._load(nxt)
+        return self._slice(start, idxs, got)
+
+    def _peek(self, page: int) -> list[dict] | None:
+        """Items for `page` if its chunk(s) are already here, without fetching."""
+        start, idxs = self._span(page)
+        got = []
+        for idx in idxs:
+            items = self.chunks.get(idx)
+            if items is None:
+                return None
+            got.append(items)
+            if len(items) < self.chunk:
+                break
+        return self._slice(start, idxs, got)
+
+    def _cached(self, page: int) -> bool:
+        items = self._peek(page)
+        return items is not None and gallery.cached(items, (page - 1) * COLLECTION_PAGE_SIZE + 1)
+
+    def _sync_buttons(self, n_items: int):
+        pages = self.pages
+        self.first_page.disabled = self.prev_page.disabled = self.page <= 1
+        self.next_page.disabled = (self.page >= pages) if pages else n_items < COLLECTION_PAGE_SIZE
+        self.jump.disabled = pages == 1
+
+    async def render(self, page: int) -> tuple[discord.Embed, list[discord.File]]:
+        if self.pages:
+            page = min(page, self.pages)
+        self.page = max(1, page)
+        items = await self.page_items(self.page)
+        self._sync_buttons(len(items))
+        first = (self.page - 1) * COLLECTION_PAGE_SIZE + 1
+        png = None
+        try:
+            # Slow art hosts must not hold the reply; the render keeps going and serves the next click.
+            png = await asyncio.wait_for(gallery.page_png(items, first), GALLERY_WAIT_S)
+        except asyncio.TimeoutError:
+            metrics.inc("tlk_gallery_deadline_total")
+        except Exception as e:
+            print("[gallery] render failed:", e)
+        # Pre-render the next page so ▶ is a single edit with nothing to wait on.
+        nxt = self._peek(self.page + 1)
+        if nxt:
+            _spawn(gallery.page_png(nxt, first + COLLECTION_PAGE_SIZE))
+        emb = _collection_embed(self.owner_name, self.filt, self.meta, items, self.page, self.pages, with_image=png is not None)
+        files = [discord.File(io.BytesIO(png), filename=GALLERY_FILENAME)] if png else []
+        return emb, files
+
+    async def show(self, itx: discord.Interaction, page: int):
+        if itx.user.id != self.owner_id:
+            return await itx.response.send_message("Run `/collection` to browse your own cards.", ephemeral=True)
+        if self._cached(page):
+            # Instant path: one edit, no backend call, no render.
+            emb, files = await self.render(page)
+            return await itx.response.edit_message(embed=emb, attachments=files, view=self)
+        await itx.response.defer()
+        emb, files = await self.render(page)
+        await itx.edit_original_response(embed=emb, attachments=files, view=self)
+
+    @discord.ui.button(label="⏮", style=discord.ButtonStyle.secondary)
+    async def first_page(self, itx: discord.Interaction, _button: discord.ui.Button):
+        await self.show(itx, 1)
+
+    @discord.ui.button(label="◀", style=discord.ButtonStyle.secondary)
+    async def prev_page(self, itx: discord.Interaction, _button: discord.ui.Button):
+        await self.show(itx, self.page - 1)
+
+    @discord.ui.button(label="▶", style=discord.ButtonStyle.secondary)
+    async def next_page(self, itx: discord.Interaction, _button: discord.ui.Button):
+        await self.show(itx, self.page + 1)
+
+    @discord.ui.button(label="Jump…", style=discord.ButtonStyle.primary)
+    async def jump(self, itx: discord.Interaction, _button: discord.ui.Button):
+        if itx.user.id != self.owner_id:
+            return await itx.response.send_message("Run `/collection` to browse your own cards.", ephemeral=True)
+        await itx.response.send_modal(_JumpModal(self))
+
 @bot.tree.command(name="collection", description="View your collection as an image gallery (10 per page).")
 @app_commands.guilds(discord.Object(id=GID))
-@app_commands.describe(page="Page number (starts at 1)")
+@app_commands.describe(page="Page to start on (starts at 1)")
 @app_commands.choices(rarity=RARITY_CHOICES, position=POSITION_CHOICES, batch=BATCH_CHOICES)
+@instrumented
 async def collection(
     interaction: discord.Interaction,
     page: int = 1,
@@ -722,52 +3196,56 @@ async def collection(
     try:
         filt = {
             "user_id": str(interaction.user.id),
-            "page": max(1, page),
-            "page_size": 10,
             "unique_only": bool(unique_only),
             "rarity": (rarity.value if rarity else "ALL"),
             "position": (position.value if position else "ALL"),
             "batch": (batch.value if batch else "ALL"),
         }
-        data = await call_sheet("collection", filt)
-        items: list[dict] = data.get("items", [])
-        counts = data.get("counts", {})
-        total = data.get("total", len(items))
-        page_num = data.get("page", page)
-        summary = " | ".join([f"{k}: {v}" for k, v in counts.items()]) if counts else ""
-        emb = discord.Embed(
-            title=f"{interaction.user.display_name} — Collection",
-            description=(f"{summary}\nFilters: R={filt['rarity']} • Pos={filt['position']} • Batch={filt['batch']}"
-                         + (" • Unique only" if unique_only else "")),
-            color=0x2B2D31,
-        )
-        emb.set_footer(text=f"Page {page_num} • Showing {len(items)} of {total}")
-        for i, it in enumerate(items[:10], start=1):
-            nm = it.get("name","(unknown)")
-            rn = it.get("rarity","")
-            sn = it.get("serial_no")
-            emb.add_field(name=f"{i}. {nm} [{rn}] " + (f"#{sn}" if sn else ""), value=it.get("card_id",""), inline=False)
-        await interaction.followup.send(embed=emb)
+        view = CollectionBrowser(interaction.user.id, interaction.user.display_name, filt)
+        emb, files = await view.render(max(1, page))
+        await interaction.followup.send(embed=emb, files=files, view=view)
     except Exception as e:
+        mark_command_error()
         await interaction.followup.send(f"Error: {e}")
 
 # --- Utility ---
 @bot.tree.command(name="whoami", description="Show your Discord user ID.")
 @app_commands.guilds(discord.Object(id=GID))
+@instrumented
 async def whoami(interaction: discord.Interaction):
     if not await ensure_channel(interaction): return
     await interaction.response.send_message(f"Your ID: `{interaction.user.id}`", ephemeral=True)
 
+@bot.tree.command(name="reveal_mode", description="Choose how your packs are revealed by default.")
+@app_commands.guilds(discord.Object(id=GID))
+@app_commands.describe(mode="Manual (tap to flip), Auto (timed), or Instant (one message)")
+@app_commands.choices(mode=REVEAL_CHOICES)
+@instrumented
+async def reveal_mode(interaction: discord.Interaction, mode: app_commands.Choice[str]):
+    if not await ensure_channel(interaction): return
+    prefs.set(interaction.user.id, "reveal_mode", mode.value)
+    await interaction.response.send_message(f"Reveal mode set to **{mode.value}**.", ephemeral=True)
+
 @bot.tree.command(name="resync", description="Admin: resync app commands")
 @app_commands.guilds(discord.Object(id=GID))
+@instrumented
 async def resync(interaction: discord.Interaction):
     if str(interaction.user.id) != os.getenv("ADMIN_USER_ID", ""):
         return await interaction.response.send_message("Nope.", ephemeral=True)
     await interaction.response.defer(ephemeral=True, thinking=True)
-    gid = int(os.getenv("GUILD_ID","0"))
-    guild = discord.Object(id=gid) if gid else None
-    synced = await bot.tree.sync(guild=guild) if guild else await bot.tree.sync()
-    await interaction.followup.send(f"Synced: {', '.join(c.name for c in synced)}", ephemeral=True)
+    synced = await sync_commands(force=True)
+    await interaction.followup.send(f"Synced: {', '.join(synced or [])}", ephemeral=True)
+
+@bot.tree.command(name="cache_stats", description="Admin: show response cache hit/miss counters")
+@app_commands.guilds(discord.Object(id=GID))
+@instrumented
+async def cache_stats(interaction: discord.Interaction):
+    if interaction.user.id != ADMIN_USER_ID:
+        return await interaction.response.send_message("Nope.", ephemeral=True)
+    st = response_cache.stats()
+    lines = [f"{k}: **{v}**" for k, v in st.items()]
+    lines.append(f"balance hits/misses: **{balance_cache.hits}/{balance_cache.misses}**")
+    await interaction.response.send_message("🗃️ Response cache\n" + "\n".join(lines), ephemeral=True)
 
 
 
@@ -776,6 +3254,8 @@ async def resync(interaction: discord.Interaction):
 @app_commands.guilds(discord.Object(id=GID))
 @app_commands.describe(card_id="Pick a card (type to search by name/club/id)", quantity="How many to craft", reason="Optional note for ledger")
 @app_commands.autocomplete(card_id=ac_card_id)
+@instrumented
+@per_user_serialized()
 async def craft(interaction: discord.Interaction, card_id: str, quantity: int = 1, reason: str = "craft via bot"):
     if not await ensure_channel(interaction):
         return
@@ -794,6 +3274,7 @@ async def craft(interaction: discord.Interaction, card_id: str, quantity: int =
         # Error path (flexible)
         if (isinstance(data, dict) and data.get("error")) or (isinstance(res, dict) and res.get("error")):
             err = data.get("error") or res.get("error") or "craft failed"
+            mark_command_error("rejected")
             return await interaction.followup.send(f"⚠️ Craft error: {err}", ephemeral=True)
 
         # Costs (support multiple key names)
@@ -811,13 +3292,7 @@ async def craft(interaction: discord.Interaction, card_id: str, quantity: int =
             results = [results]
 
         # Build sections
-        yield_lines = []
-        for i, it in enumerate(results, 1):
-            nm = it.get("name") or it.get("player") or it.get("printcode") or it.get("card_id") or "Unknown"
-            rr = (it.get("rarity") or "").strip()
-            sn = it.get("serial") or it.get("serial_no")
-            sn_txt = f" #{sn}" if sn not in (None, "", 0) else ""
-            yield_lines.append(f"{i}. **{nm}** {f'[{rr}]' if rr else ''}{sn_txt}")
+        yielded = yield_lines(results)
 
         cost_bits = []
         if tickets_spent: cost_bits.append(f"🎟️ Tickets: −{int(tickets_spent)}")
@@ -833,8 +3308,8 @@ async def craft(interaction: discord.Interaction, card_id: str, quantity: int =
         desc = []
         if cost_bits:
             desc.append("**Cost**\n" + "\n".join(f"• {x}" for x in cost_bits))
-        if yield_lines:
-            desc.append("**Yield**\n" + "\n".join(yield_lines))
+        if yielded:
+            desc.append("**Yield**\n" + "\n".join(yielded))
         if not desc:
             desc.append("Crafted successfully.")
 
@@ -849,12 +3324,14 @@ async def craft(interaction: discord.Interaction, card_id: str, quantity: int =
         await interaction.followup.send(embed=emb, ephemeral=True)
 
     except Exception as e:
-        await interaction.followup.send(f"⚠️ Error: {e}", ephemeral=True)
+        await reply_error(interaction, f"⚠️ Error: {e}")
 
 
 @bot.tree.command(name="shop", description="View shop or buy an item by ID.")
 @app_commands.guilds(discord.Object(id=GID))
 @app_commands.describe(buy_item_id="Item/sku ID to buy (leave empty to list)", quantity="How many to buy")
+@instrumented
+@per_user_serialized(when=lambda kw: bool((kw.get("buy_item_id") or "").strip()))
 async def shop(interaction: discord.Interaction, buy_item_id: str = "", quantity: int = 1):
     if not await ensure_channel(interaction):
         return
@@ -911,6 +3388,7 @@ async def shop(interaction: discord.Interaction, buy_item_id: str = "", quantity
         data = res.get("data", res) if isinstance(res, dict) else {}
         if isinstance(data, dict) and (data.get("error") or res.get("error")):
             err = data.get("error") or res.get("error")
+            mark_command_error("rejected")
             return await interaction.followup.send(f"⚠️ Purchase failed: {err}", ephemeral=True)
 
         # Cost from response
@@ -924,13 +3402,7 @@ async def shop(interaction: discord.Interaction, buy_item_id: str = "", quantity
         bought = data.get("items") or data.get("results") or data.get("bought") or []
         if isinstance(bought, dict):
             bought = [bought]
-        yield_lines = []
-        for i, it in enumerate(bought, 1):
-            nm = it.get("name") or it.get("player") or it.get("title") or it.get("card_id") or buy_item_id
-            rr = (it.get("rarity") or "").strip()
-            sn = it.get("serial") or it.get("serial_no")
-            sn_txt = f" #{sn}" if sn not in (None, "", 0) else ""
-            yield_lines.append(f"{i}. **{nm}** {f'[{rr}]' if rr else ''}{sn_txt}")
+        yielded = yield_lines(bought, buy_item_id)
 
         # Balances
         tickets_bal = data.get("tickets_balance")
@@ -942,8 +3414,8 @@ async def shop(interaction: discord.Interaction, buy_item_id: str = "", quantity
         sections = []
         if price_desc:
             sections.append("**Cost**\n" + "\n".join(f"• {x}" for x in price_desc))
-        if yield_lines:
-            sections.append("**Yield**\n" + "\n".join(yield_lines))
+        if yielded:
+            sections.append("**Yield**\n" + "\n".join(yielded))
 
         emb = discord.Embed(
             title=f"✅ Purchased — {buy_item_id} ×{qty}",
@@ -956,7 +3428,7 @@ async def shop(interaction: discord.Interaction, buy_item_id: str = "", quantity
         await interaction.followup.send(embed=emb, ephemeral=True)
 
     except Exception as e:
-        await interaction.followup.send(f"⚠️ Error: {e}", ephemeral=True)
+        await reply_error(interaction, f"⚠️ Error: {e}")
 
 
 
@@ -971,9 +3443,63 @@ async def on_app_cmd_error(interaction: discord.Interaction, error: app_commands
         await interaction.followup.send(f"⚠️ Oops: {error}", ephemeral=True)
     print("App command error:", repr(error))
 
+# --- Runtime (event loop, default executor, slow-callback detection) ---
+LOOP_IMPL        = os.getenv("LOOP_IMPL", "auto").lower()       # auto (uvloop if installed) | uvloop | asyncio
+EXECUTOR_WORKERS = int(os.getenv("EXECUTOR_WORKERS", "0"))      # default pool for to_thread/DNS; 0 = min(32, cpus + 4)
+SLOW_CALLBACK_MS = float(os.getenv("SLOW_CALLBACK_MS", "0"))    # >0: asyncio debug mode, log callbacks slower than this
+
+def _loop_factory():
+    """(name, factory) for asyncio.Runner; uvloop when available unless LOOP_IMPL=asyncio."""
+    if LOOP_IMPL != "asyncio":
+        try:
+            import uvloop
+            return "uvloop", uvloop.new_event_loop
+        except ImportError:
+            if LOOP_IMPL == "uvloop":
+                raise RuntimeError("LOOP_IMPL=uvloop but uvloop isn't installed (pip install uvloop).")
+    return "asyncio", None
+
+class _SlowCallbackLog(logging.Handler):
+    """asyncio's debug mode reports "Executing <Handle ...> took 0.312 seconds"; count and print those."""
+
+    def emit(self, record: logging.LogRecord):
+        msg = record.getMessage()
+        if msg.startswith("Executing "):
+            metrics.inc("tlk_slow_callbacks_total")
+            print("🐢 [loop] slow callback:", msg)
+
+def _tune_loop(loop: asyncio.AbstractEventLoop):
+    workers = EXECUTOR_WORKERS or min(32, (os.cpu_count() or 1) + 4)
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tlk-io"))
+    if SLOW_CALLBACK_MS > 0:
+        loop.set_debug(True)
+        loop.slow_callback_duration = SLOW_CALLBACK_MS / 1000
+        log = logging.getLogger("asyncio")
+        log.setLevel(logging.WARNING)   # debug mode is chatty at DEBUG; slow callbacks are WARNING
+        log.addHandler(_SlowCallbackLog())
+    print(f"[runtime] {type(loop).__module__}.{type(loop).__name__}, executor {workers} threads"
+          + (f", slow callbacks > {SLOW_CALLBACK_MS:g} ms logged" if SLOW_CALLBACK_MS > 0 else ""))
+
+async def main():
+    """Startup, the gateway session and shutdown all run on this one loop."""
+    loop = asyncio.get_running_loop()
+    _tune_loop(loop)
+    task = asyncio.current_task()
+    with contextlib.suppress(NotImplementedError):   # no signal handlers on Windows loops
+        loop.add_signal_handler(signal.SIGTERM, task.cancel)   # docker stop -> same path as Ctrl-C
+    async with bot:
+        try:
+            await bot.start(TOKEN)
+        finally:
+            await bot.close()
+            await _graceful_close()
+
 # --- Main ---
 if __name__ == "__main__":
-    try:
-        bot.run(TOKEN)
-    finally:
-        asyncio.run(_graceful_close())
+    discord.utils.setup_logging(root=False)   # what bot.run() used to set up
+    impl, factory = _loop_factory()
+    with asyncio.Runner(loop_factory=factory) as runner:
+        try:
+            runner.run(main())
+        except (KeyboardInterrupt, asyncio.CancelledError):
+            print(f"Shut down ({impl} loop).")
@@ -0,0 +1,122 @@
+"""Run bot.py as several processes ("clusters"), each owning a contiguous slice of shards.
+
+The total shard count comes from SHARD_COUNT or Discord's recommendation
+(GET /gateway/bot). Each cluster gets SHARD_IDS, SHARD_COUNT and CLUSTER_ID, its own
+METRICS_PORT (base + cluster id). DATA_DIR stays shared (prefs, re-hosted art URLs);
+bot.py keeps its per-process files under DATA_DIR/cluster-<id>. Clusters start
+staggered so identifies stay inside Discord's max_concurrency, and a crashed
+cluster is restarted with backoff. With more than one cluster, point every process
+at the same STATE_BACKEND=redis so per-user locks and invalidations are shared.
+
+    python cluster.py                          # recommended shards, one cluster per CPU
+    CLUSTERS=2 SHARD_COUNT=8 python cluster.py
+"""
+import os, sys, signal, asyncio, time, aiohttp
+from pathlib import Path
+from dotenv import load_dotenv, find_dotenv
+
+load_dotenv(find_dotenv() or str(Path(__file__).with_name(".env")))
+
+TOKEN          = os.getenv("DISCORD_TOKEN")
+SHARD_COUNT    = int(os.getenv("SHARD_COUNT", "0"))      # 0 = ask Discord
+CLUSTERS       = int(os.getenv("CLUSTERS", "0"))         # 0 = one per CPU (capped at the shard count)
+METRICS_PORT   = int(os.getenv("METRICS_PORT", "9108"))  # cluster N serves on METRICS_PORT + N; 0 disables
+IDENTIFY_GAP_S = 5.0                                      # Discord: one identify per bucket per 5s
+RESTART_MAX_S  = 60.0
+BOT_PY         = str(Path(__file__).with_name("bot.py"))
+
+async def gateway_info() -> tuple[int, int]:
+    """(recommended shards, max_concurrency) for this token."""
+    async with aiohttp.ClientSession() as s:
+        async with s.get("https://discord.com/api/v10/gateway/bot",
+                         headers={"Authorization": f"Bot {TOKEN}"}) as resp:
+            resp.raise_for_status()
+            data = await resp.json()
+    return int(data["shards"]), int(data.get("session_start_limit", {}).get("max_concurrency", 1))
+
+def plan(shard_count: int, clusters: int) -> list[list[int]]:
+    """Split 0..shard_count-1 into `clusters` contiguous, near-equal slices."""
+    per, extra = divmod(shard_count, clusters)
+    out, start = [], 0
+    for i in range(clusters):
+        n = per + (1 if i < extra else 0)
+        out.append(list(range(start, start + n)))
+        start += n
+    return out
+
+class Cluster:
+    def __init__(self, cid: int, shard_ids: list[int], shard_count: int):
+        self.cid, self.shard_ids, self.shard_count = cid, shard_ids, shard_count
+        self.proc: asyncio.subprocess.Process | None = None
+        self.restarts = 0
+
+    def env(self) -> dict:
+        env = dict(os.environ)
+        env.update({
+            "SHARD_IDS": ",".join(map(str, self.shard_ids)),
+            "SHARD_COUNT": str(self.shard_count),
+            "CLUSTER_ID": str(self.cid),
+            "METRICS_PORT": str(METRICS_PORT + self.cid if METRICS_PORT else 0),
+        })
+        return env
+
+    async def run(self, stopping: asyncio.Event):
+        backoff = 1.0
+        while not stopping.is_set():
+            print(f"[cluster {self.cid}] starting shards {self.shard_ids[0]}-{self.shard_ids[-1]} of {self.shard_count}")
+            t0 = time.monotonic()
+            self.proc = await asyncio.create_subprocess_exec(sys.executable, BOT_PY, env=self.env())
+            rc = await self.proc.wait()
+            if stopping.is_set():
+                break
+            if time.monotonic() - t0 > RESTART_MAX_S:
+                backoff = 1.0   # it ran fine for a while; this is a fresh failure
+            self.restarts += 1
+            print(f"[cluster {self.cid}] exited with {rc}; restarting in {backoff:.0f}s")
+            try:
+                await asyncio.wait_for(stopping.wait(), backoff)
+            except asyncio.TimeoutError:
+                pass
+            backoff = min(RESTART_MAX_S, backoff * 2)
+
+    def terminate(self):
+        if self.proc is not None and self.proc.returncode is None:
+            self.proc.send_signal(signal.SIGTERM)   # bot.py closes the gateway and sessions on SIGTERM
+
+async def main():
+    if not TOKEN:
+        raise SystemExit("DISCORD_TOKEN is missing.")
+    shard_count, max_conc = SHARD_COUNT, 1
+    if not shard_count:
+        shard_count, max_conc = await gateway_info()
+    clusters = max(1, min(CLUSTERS or os.cpu_count() or 1, shard_count))
+    if clusters > 1 and os.getenv("STATE_BACKEND", "memory").lower() == "memory":
+        print("⚠️  STATE_BACKEND=memory with several clusters: per-user locks and cache invalidation are per process.")
+    slices = plan(shard_count, clusters)
+    print(f"[launcher] {shard_count} shards across {clusters} clusters (max_concurrency {max_conc})")
+
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stopping.set)
+
+    members = [Cluster(i, ids, shard_count) for i, ids in enumerate(slices)]
+    tasks = []
+    for m in members:
+        tasks.append(asyncio.create_task(m.run(stopping)))
+        # the next cluster identifies only after this one's shards have had their turn
+        gap = IDENTIFY_GAP_S * -(-len(m.shard_ids) // max_conc)
+        try:
+            await asyncio.wait_for(stopping.wait(), gap)
+        except asyncio.TimeoutError:
+            pass
+        if stopping.is_set():
+            break
+    await stopping.wait()
+    print("[launcher] stopping clusters")
+    for m in members:
+        m.terminate()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+if __name__ == "__main__":
+    asyncio.run(main())